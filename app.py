@@ -1,49 +1,47 @@
 
 import streamlit as st
+import os
 import re
-from comparator import compare_documents_v2
+import time
+import instrumentation
+from instrumentation import stage
+from comparator import (
+    compare_documents_v2,
+    compare_by_sections,
+    extract_keywords,
+    evidence_snippet,
+    IncrementalComparison,
+    PositionalIndex,
+    save_log
+)
 from pdf_extractor import (
-    extract_text_from_pdf,
-    extract_text_by_page,
-    summarize_pdf_statistics,
+    load_document,
+    load_revision,
+    extract_document_title,
     get_file_info
 )
-from feedback_generator import generate_feedback
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-
-# 🔍 제안서 제목 추출
-def extract_document_title(text: str) -> str:
-    candidates = text.split("\n")
-    candidates = [line.strip() for line in candidates if len(line.strip()) > 5 and len(line.strip()) < 60]
-    for line in candidates:
-        if any(keyword in line for keyword in ["제안서", "계획", "방안", "구축", "시스템"]):
-            return line
-    return candidates[0] if candidates else "제안 제목 미상"
-
-# 📘 제안요청서에서 가장 유사한 문단만 추출
-def get_best_matching_section(rfp_text: str, title: str) -> str:
-    paragraphs = [p.strip() for p in rfp_text.split("\n\n") if len(p.strip()) > 30]
-    if not paragraphs:
-        return "[❗ 유효한 문단이 없습니다.]"
-
-    vectorizer = TfidfVectorizer().fit(paragraphs + [title])
-    para_vectors = vectorizer.transform(paragraphs)
-    title_vector = vectorizer.transform([title])
-
-    scores = cosine_similarity(title_vector, para_vectors)[0]
-    top_idx = scores.argmax()
-    top_score = scores[top_idx]
-
-    if top_score < 0.1:
-        return "[❗ 관련 항목을 찾을 수 없습니다.]"
-
-    return paragraphs[top_idx]
+from feedback_generator import (
+    generate_feedback_stream,
+    generate_feedback_map_reduce,
+    needs_batching,
+    feedback_cache_key,
+    FEEDBACK_MODEL
+)
+from results_store import get_results_store
+from retrieval import get_best_matching_section, get_paragraph_index
 
 # 📄 앱 구성
 st.set_page_config(page_title="제안서 피드백 시스템 (고도화)", layout="wide")
 st.title("🧠 제안서 제목 기반 항목 비교 시스템 (유사도 정밀 추출 버전)")
 
+# ⏱️ 성능 측정 결과 표시 (계측은 프로세스 전체 설정이므로 PROPOSAL_PERF=1 로 실행할 때만 켜짐
+#    → 한 세션의 체크박스가 다른 세션의 계측을 켜고 끄지 않도록 여기서는 표시 여부만 선택)
+show_perf = st.sidebar.checkbox("⏱️ 성능 측정 결과 보기", value=False, disabled=not instrumentation.is_enabled(),
+                                help="PROPOSAL_PERF=1 로 실행하면 단계별 시간/메모리를 perf_log.jsonl 에 기록합니다.")
+run_started = time.time()
+perf_run = instrumentation.start_run()  # 이번 스크립트 실행의 기록만 모아 보기 위한 id
+show_evidence = st.sidebar.checkbox("🔎 항목별 근거 위치 표시", value=False)
+
 col1, col2 = st.columns(2)
 with col1:
     rfp_file = st.file_uploader("📥 제안요청서 PDF 업로드", type="pdf", key="rfp")
@@ -56,49 +54,174 @@ if rfp_file and proposal_file:
     col1.json(get_file_info(rfp_file))
     col2.json(get_file_info(proposal_file))
 
-    with st.spinner("📖 텍스트 추출 중..."):
-        rfp_file.seek(0)
-        rfp_text = extract_text_from_pdf(rfp_file)
+    with st.spinner("📖 텍스트 추출 중..."), stage("app.extraction"):
+        # 같은 내용의 파일은 캐시된 파싱 결과를 재사용 (재실행/버튼 클릭 시 재파싱 없음)
+        workers = os.cpu_count() or 1
+        rfp_doc = load_document(rfp_file.getvalue(), workers=workers)
+        # 같은 파일명의 이전 버전이 있으면 바뀐 페이지만 다시 추출
+        revisions = st.session_state.setdefault("proposal_revisions", {})
+        previous = revisions.get(proposal_file.name)
+        proposal_doc = load_revision(proposal_file.getvalue(), previous=previous and previous["doc"], workers=workers)
 
-        proposal_file.seek(0)
-        proposal_text = extract_text_from_pdf(proposal_file)
-
-        rfp_file.seek(0)
-        rfp_page_data = extract_text_by_page(rfp_file.read())
-        proposal_file.seek(0)
-        proposal_page_data = extract_text_by_page(proposal_file.read())
+        rfp_text = rfp_doc["text"]
+        proposal_text = proposal_doc["text"]
 
     st.subheader("📊 문서 통계")
     tab1, tab2 = st.tabs(["제안요청서", "제안서"])
     with tab1:
-        st.json(summarize_pdf_statistics(rfp_page_data))
+        st.json(rfp_doc["stats"])
     with tab2:
-        st.json(summarize_pdf_statistics(proposal_page_data))
+        st.json(proposal_doc["stats"])
 
     st.subheader("📝 제안서 제목 자동 추출")
-    proposal_title = extract_document_title(proposal_text)
+    with stage("app.title"):
+        proposal_title = extract_document_title(proposal_text)
     st.write(f"📌 추출된 제안서 제목: **{proposal_title}**")
 
     st.subheader("🎯 유사도 기반 제안요청서 항목 자동 추출")
-    matched_section = get_best_matching_section(rfp_text, proposal_title)
+    with stage("app.matching"):
+        matched_section = get_best_matching_section(rfp_text, proposal_title)
     st.code(matched_section)
+    with st.expander("🔎 유사 문단 후보 (상위 5개)"):
+        for hit in get_paragraph_index(rfp_text).query(proposal_title, top_k=5):
+            st.write(f"- 유사도 `{round(hit['score'], 3)}` | {hit['paragraph'][:120]}")
 
     st.subheader("📐 항목 비교 결과")
-    comparison_result = compare_documents_v2(matched_section, proposal_text)
+    # RFP 전체를 섹션 단위로 평가 (섹션 번호 체계가 없으면 유사 문단 기준 비교)
+    revision_update = None  # 이전 버전 대비 변경 내역
+    with stage("app.comparison") as s:
+        if "page_hashes" in proposal_doc:
+            # 이전 버전과 같은 RFP 기준이면 영향받는 항목만 다시 채점
+            comparison_key = (rfp_doc["hash"], matched_section)
+            same_basis = previous is not None and previous["key"] == comparison_key
+            if same_basis:
+                comparison = previous["comparison"]
+            else:
+                comparison = IncrementalComparison(rfp_text, fallback_text=matched_section)
+            update = comparison.update(proposal_doc["pages"], proposal_doc["page_hashes"])
+            comparison_result = update["결과"]
+            # 새 버전이 올라온 경우의 변경 내역은 이후 재실행(버튼 클릭 등)에서도 계속 표시
+            if same_basis and previous["doc"]["hash"] != proposal_doc["hash"]:
+                revision_update = update
+            elif same_basis:
+                revision_update = previous["update"]
+            revisions[proposal_file.name] = {"doc": proposal_doc, "key": comparison_key,
+                                             "comparison": comparison, "update": revision_update}
+        else:
+            comparison_result = compare_by_sections(rfp_text, proposal_doc["pages"])
+            if not comparison_result:
+                comparison_result = compare_documents_v2(matched_section, proposal_text, pages=proposal_doc["pages"])
+        s.set(items=len(comparison_result))
+
+    # 📚 평가 이력 기록 (같은 문서 조합·비교 기준은 세션당 한 번, 저장은 백그라운드에서 진행)
+    run_key = (rfp_doc["hash"], proposal_doc["hash"], matched_section)
+    recorded_runs = st.session_state.setdefault("recorded_runs", {})
+    run_id = recorded_runs.get(run_key)
+    if run_id is None:
+        # 이번 실행의 기록만, 같은 단계(제안요청서·제안서의 pdf.load_document 등)는 합산
+        timings = instrumentation.stage_totals(perf_run)
+        timings["전체(s)"] = round(time.time() - run_started, 3)
+        run_id = recorded_runs[run_key] = save_log(
+            comparison_result,
+            source="app",
+            proposal_name=proposal_file.name,
+            proposal_hash=proposal_doc["hash"],
+            rfp_name=rfp_file.name,
+            rfp_hash=rfp_doc["hash"],
+            mode="sections" if comparison_result and "섹션" in comparison_result[0] else "paragraph",
+            timings=timings
+        )
+
+    if revision_update:
+        st.subheader("🔁 이전 버전 대비 변경")
+        st.write(f"- 변경된 페이지: `{revision_update['변경 페이지 수']}` | "
+                 f"다시 평가한 항목: `{revision_update['재평가 항목 수']}`")
+        if revision_update["변경"]:
+            st.dataframe(revision_update["변경"], use_container_width=True)
+        else:
+            st.caption("포함 여부가 바뀐 항목이 없습니다.")
+    evidence_index = None
+    if show_evidence:
+        # 제안서별 위치 색인은 한 번만 구축 (근거 조회는 키워드 수에 비례)
+        cached = st.session_state.get("evidence_index")
+        if cached is None or cached[0] != proposal_doc["hash"]:
+            cached = (proposal_doc["hash"], PositionalIndex.from_pages(proposal_doc["pages"]))
+            st.session_state["evidence_index"] = cached
+        evidence_index = cached[1]
+
+    current_section = None
     for item in comparison_result:
+        if item.get("섹션") and item["섹션"] != current_section:
+            current_section = item["섹션"]
+            st.markdown(f"## 🗂️ {current_section}")
+            st.caption(f"비교 대상 제안서 페이지: {item['근거페이지'] or '없음'}")
         st.markdown(f"### 🔹 {item['항목']}")
         st.write(f"- 포함 여부: `{item['포함여부']}`")
         st.write(f"- 키워드 수: `{item['키워드수']}`")
         st.write(f"- 매칭률: `{round(item['매칭률'] * 100, 1)}%`")
-
+        if evidence_index is not None:
+            evidence = item if "근거" in item else evidence_index.evidence(
+                extract_keywords(item["항목"]), page_numbers=item.get("근거페이지")
+            )
+            with st.expander(f"🔎 근거 위치 (일치 키워드 {len(evidence['일치 키워드'])}개)"):
+                window = evidence["근거 구간"]
+                if window:
+                    st.caption(f"근거가 가장 많이 모인 구간: {window['시작 페이지']}~{window['끝 페이지']} 페이지 "
+                               f"(키워드 {window['키워드수']}개)")
+                for hit in evidence["근거"]:
+                    page_text = proposal_doc["pages"][hit["페이지"] - 1]["text"]
+                    snippet = evidence_snippet(page_text, hit["위치"], len(hit["키워드"]))
+                    st.write(f"- `{hit['키워드']}` · {hit['페이지']}페이지 · {snippet}")
+
+    refresh_feedback = st.checkbox("♻️ 캐시된 피드백 대신 새로 생성", value=False)
     if st.button("🧾 피드백 생성"):
-        with st.spinner("피드백 작성 중..."):
-            prompt_text = ""
-            for item in comparison_result:
-                prompt_text += f"[{item['항목']}] → {item['포함여부']}\n"
-            feedback = generate_feedback(prompt_text)
+        prompt_text = ""
+        for item in comparison_result:
+            prompt_text += f"[{item['항목']}] → {item['포함여부']}\n"
         st.subheader("🧠 생성된 피드백")
-        st.write(feedback)
+        feedback_started = time.time()
+        batched = needs_batching(prompt_text)
+        if batched:
+            # 모델 컨텍스트를 넘는 경우: 항목 묶음별 동시 생성 후 통합
+            with st.spinner("항목이 많아 묶음별로 피드백을 작성 중..."):
+                feedback = generate_feedback_map_reduce(prompt_text, use_cache=not refresh_feedback)
+            st.write(feedback)
+        else:
+            # 토큰이 도착하는 대로 화면에 표시
+            feedback = st.write_stream(generate_feedback_stream(prompt_text, use_cache=not refresh_feedback))
+        get_results_store().record_feedback(
+            run_id,
+            feedback if isinstance(feedback, str) else "".join(map(str, feedback)),
+            model=FEEDBACK_MODEL,
+            cache_key=None if batched else feedback_cache_key(prompt_text),
+            elapsed_s=round(time.time() - feedback_started, 2)
+        )
+
+    with st.expander("📚 이 제안서의 평가 이력"):
+        # 이미 기록된 내용만 조회 (방금 넣은 기록을 기다리지 않음 → 화면 갱신이 기록에 막히지 않음)
+        history = get_results_store().history(proposal=proposal_file.name, limit=20)
+        st.caption("방금 평가한 결과는 기록이 끝나는 대로(1초 이내) 다음 화면 갱신부터 표시됩니다.")
+        st.dataframe([
+            {
+                "시각": time.strftime("%Y-%m-%d %H:%M", time.localtime(h["created"])),
+                "제안요청서": h["rfp_name"],
+                "비교 방식": h["mode"],
+                "포함됨": h["included"],
+                "부분 포함": h["partial"],
+                "누락됨": h["missing"],
+                "해시": h["proposal_hash"][:12],
+            }
+            for h in history
+        ], use_container_width=True)
 
 else:
     st.info("양쪽 문서를 모두 업로드해 주세요.")
+
+if show_perf:
+    with st.expander("📈 성능", expanded=False):
+        records = instrumentation.recent_records(run_id=perf_run)
+        if records:
+            st.dataframe(records, use_container_width=True)
+        else:
+            st.caption("이번 실행에서 기록된 단계가 없습니다.")
+    instrumentation.flush()
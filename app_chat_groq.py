@@ -1,40 +1,56 @@
 import streamlit as st
-from groq import Groq
-import os
-
-# GROQ API 키 불러오기
-api_key = st.secrets["GROQ_API_KEY"]
-client = Groq(api_key=api_key)
+from pdf_extractor import load_document
+from chat_context import ChatMemory, DocumentContext, answer_question
 
 st.set_page_config(page_title="Groq 챗봇", layout="centered")
 st.title("🤖 Groq 기반 제안서 챗봇")
 
 if "chat_history" not in st.session_state:
-    st.session_state.chat_history = []
+    st.session_state.chat_history = []  # 화면 표시용 (role, 내용, 근거)
+if "chat_memory" not in st.session_state:
+    st.session_state.chat_memory = ChatMemory()  # 모델에 보내는 이력 (토큰 예산 안에서 유지)
+
+# 📥 참고 문서 (문서 내용이 바뀔 때만 구절 인덱스 재구성)
+rfp_file = st.sidebar.file_uploader("📥 제안요청서 PDF", type="pdf", key="chat_rfp")
+proposal_file = st.sidebar.file_uploader("📥 제안서 PDF", type="pdf", key="chat_proposal")
 
-# 입력창
-user_input = st.text_input("무엇이든 물어보세요:", key="input")
+uploads = [(label, f) for label, f in (("제안요청서", rfp_file), ("제안서", proposal_file)) if f is not None]
+docs = [(label, load_document(f.getvalue())) for label, f in uploads]
+context_key = tuple(doc["hash"] for _, doc in docs)
+cached = st.session_state.get("chat_context")
+if cached is None or cached[0] != context_key:
+    with st.spinner("📚 문서 색인 중..."):
+        context = DocumentContext()
+        for label, doc in docs:
+            context.add_document(label, doc["pages"])
+    st.session_state["chat_context"] = (context_key, context)
+context = st.session_state["chat_context"][1]
+
+if len(context):
+    st.sidebar.caption(f"질문마다 {', '.join(label for label, _ in docs)}에서 관련 구절만 찾아 답변합니다.")
+if st.sidebar.button("🧹 대화 초기화"):
+    st.session_state.chat_history = []
+    st.session_state.chat_memory = ChatMemory()
 
 # 대화 표시
-for role, msg in st.session_state.chat_history:
+for role, msg, passages in st.session_state.chat_history:
     if role == "user":
         st.markdown(f"**🙋‍♀️ 나:** {msg}")
     else:
         st.markdown(f"**🤖 Groq:** {msg}")
+        if passages:
+            with st.expander(f"📎 참고한 구절 {len(passages)}개"):
+                for p in passages:
+                    st.markdown(f"- **{p['문서']} p.{p['페이지']}** (유사도 {p['점수']}): {p['내용'][:200]}")
+
+# 입력창 (제출한 질문은 한 번만 처리)
+user_input = st.chat_input("무엇이든 물어보세요:")
 
 # 대화 로직
 if user_input:
-    st.session_state.chat_history.append(("user", user_input))
+    st.session_state.chat_history.append(("user", user_input, []))
 
     with st.spinner("Groq가 답변 중..."):
-        response = client.chat.completions.create(
-            model="mixtral-8x7b-32768",
-            messages=[
-                {"role": "system", "content": "당신은 공공 제안서를 잘 작성하는 전문가입니다."},
-                {"role": "user", "content": user_input}
-            ],
-            temperature=0.4
-        )
-        answer = response.choices[0].message.content.strip()
-        st.session_state.chat_history.append(("assistant", answer))
+        result = answer_question(user_input, context, st.session_state.chat_memory)
+        st.session_state.chat_history.append(("assistant", result["답변"], result["근거"]))
         st.rerun()
@@ -0,0 +1,203 @@
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Optional
+
+from pdf_extractor import load_document, compute_file_hash, extract_document_title
+from comparator import compare_documents_v2, compare_by_sections, save_log
+from retrieval import ParagraphIndex, get_paragraph_index, best_matching_paragraph
+from results_store import get_results_store
+
+# ================================================================
+# 🗂️ 제안서 일괄 평가 CLI (Streamlit 없이 실행)
+# - 제안요청서 1건의 텍스트/문단 인덱스는 한 번만 만들고 워커에 전달
+# - 제안서 디렉터리를 프로세스 풀에서 병렬 평가, 끝나는 순서대로 JSONL/CSV 에 기록
+# - 재실행 시 결과 파일에 이미 있는 파일 해시는 건너뜀 (--no-resume 으로 해제)
+# - 제안서별 결과는 평가 이력 저장소(results_store)에도 기록
+# 실행: python batch_cli.py 제안요청서.pdf 제안서_폴더/ --output results.jsonl --csv results.csv
+# ================================================================
+
+CSV_FIELDS = ["파일명", "해시", "섹션", "항목", "키워드수", "매칭률", "포함여부"]
+STATUSES = ["포함됨", "부분 포함", "누락됨"]
+
+# 🧵 워커 프로세스 전역 (초기화 시 한 번만 전달)
+_rfp_text: Optional[str] = None
+_rfp_index: Optional[ParagraphIndex] = None
+
+
+def _init_worker(rfp_text: str, rfp_index: ParagraphIndex):
+    global _rfp_text, _rfp_index
+    _rfp_text = rfp_text
+    _rfp_index = rfp_index
+
+
+def document_error(doc: Dict) -> Optional[str]:
+    """파싱 실패 시 load_document 는 오류 레코드를 페이지로 돌려줌 → 그 메시지 (정상이면 None)"""
+    for page in doc["pages"]:
+        if "error" in page:
+            return page["error"]
+    return None
+
+
+def evaluate_proposal(path: str) -> Dict:
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        file_bytes = f.read()
+    doc = load_document(file_bytes)
+    # 오류 레코드를 내용으로 평가하면 전 항목 누락으로 기록되고 이어하기에서 영영 건너뛰므로 실패로 처리
+    error = document_error(doc)
+    if error is not None:
+        raise ValueError(f"PDF 를 읽을 수 없습니다: {error}")
+
+    title = extract_document_title(doc["text"])
+    matched_section = best_matching_paragraph(_rfp_index, title)
+    results = compare_by_sections(_rfp_text, doc["pages"])
+    mode = "sections"
+    if not results:
+        results = compare_documents_v2(matched_section, doc["text"], pages=doc["pages"])
+        mode = "paragraph"
+
+    return {
+        "파일명": os.path.basename(path),
+        "해시": doc["hash"],
+        "제목": title,
+        "유사 문단": matched_section,
+        "비교 방식": mode,
+        "통계": doc["stats"],
+        "요약": {status: sum(1 for r in results if r["포함여부"] == status) for status in STATUSES},
+        "결과": results,
+        "소요 시간(s)": round(time.perf_counter() - start, 3),
+    }
+
+
+# ------------------------------------------------------------
+# 📥 재실행(이어하기)용: 이미 기록된 해시
+# ------------------------------------------------------------
+def load_done_hashes(output_path: str) -> set:
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["해시"])
+            except (ValueError, KeyError):
+                continue  # 중단 시 잘린 마지막 줄 등
+    return done
+
+
+def list_proposals(directory: str) -> List[str]:
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(".pdf")
+    )
+
+
+def file_hash(path: str) -> str:
+    with open(path, "rb") as f:
+        return compute_file_hash(f.read())
+
+
+# ------------------------------------------------------------
+# 📤 결과 기록
+# ------------------------------------------------------------
+class ResultWriter:
+    def __init__(self, output_path: str, csv_path: Optional[str] = None):
+        self.jsonl = open(output_path, "a", encoding="utf-8")
+        self.csv_file = None
+        self.csv_writer = None
+        if csv_path:
+            new_file = not os.path.exists(csv_path) or os.path.getsize(csv_path) == 0
+            self.csv_file = open(csv_path, "a", encoding="utf-8-sig", newline="")
+            self.csv_writer = csv.DictWriter(self.csv_file, fieldnames=CSV_FIELDS)
+            if new_file:
+                self.csv_writer.writeheader()
+
+    def write(self, record: Dict):
+        self.jsonl.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.jsonl.flush()
+        if self.csv_writer:
+            for item in record["결과"]:
+                self.csv_writer.writerow({
+                    "파일명": record["파일명"],
+                    "해시": record["해시"],
+                    "섹션": item.get("섹션", ""),
+                    "항목": item["항목"],
+                    "키워드수": item["키워드수"],
+                    "매칭률": item["매칭률"],
+                    "포함여부": item["포함여부"],
+                })
+            self.csv_file.flush()
+
+    def close(self):
+        self.jsonl.close()
+        if self.csv_file:
+            self.csv_file.close()
+
+
+def run_batch(rfp_path: str, proposal_dir: str, output_path: str, csv_path: Optional[str] = None,
+              workers: int = 1, resume: bool = True) -> int:
+    with open(rfp_path, "rb") as f:
+        rfp_doc = load_document(f.read())
+    error = document_error(rfp_doc)
+    if error is not None:
+        raise ValueError(f"제안요청서 PDF 를 읽을 수 없습니다: {error}")
+    rfp_text = rfp_doc["text"]
+    rfp_index = get_paragraph_index(rfp_text)
+
+    done = load_done_hashes(output_path) if resume else set()
+    pending = []
+    for path in list_proposals(proposal_dir):
+        if file_hash(path) in done:
+            print(f"⏭️  건너뜀 (이미 평가됨): {os.path.basename(path)}")
+        else:
+            pending.append(path)
+    print(f"📋 평가 대상 {len(pending)}건 (워커 {workers}개)")
+
+    writer = ResultWriter(output_path, csv_path)
+    failures = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(rfp_text, rfp_index)) as pool:
+            futures = {pool.submit(evaluate_proposal, path): path for path in pending}
+            for count, future in enumerate(as_completed(futures), 1):
+                name = os.path.basename(futures[future])
+                try:
+                    record = future.result()
+                except Exception as e:
+                    failures += 1
+                    print(f"❌ [{count}/{len(pending)}] {name}: {e}", file=sys.stderr)
+                    continue
+                writer.write(record)
+                save_log(record["결과"], source="batch", proposal_name=record["파일명"], proposal_hash=record["해시"],
+                         rfp_name=os.path.basename(rfp_path), rfp_hash=rfp_doc["hash"], mode=record["비교 방식"],
+                         timings={"소요 시간(s)": record["소요 시간(s)"]})
+                summary = " | ".join(f"{k} {v}" for k, v in record["요약"].items())
+                print(f"✅ [{count}/{len(pending)}] {name} ({record['소요 시간(s)']}s) {summary}")
+    finally:
+        writer.close()
+        get_results_store().flush()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="제안요청서 1건에 대해 제안서 폴더를 일괄 평가")
+    parser.add_argument("rfp", help="제안요청서 PDF 경로")
+    parser.add_argument("proposals", help="제안서 PDF 폴더")
+    parser.add_argument("--output", default="batch_results.jsonl", help="결과 JSONL 경로")
+    parser.add_argument("--csv", help="항목별 결과 CSV 경로 (선택)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--no-resume", action="store_true", help="이미 평가된 파일도 다시 평가")
+    args = parser.parse_args()
+
+    failures = run_batch(args.rfp, args.proposals, args.output, args.csv,
+                         workers=args.workers, resume=not args.no_resume)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from datetime import datetime
+
+# ================================================================
+# 🚀 콜드 스타트(import 시간) 벤치마크 + 예산 검사
+# - 새 인터프리터에서 python -X importtime 으로 측정 (중앙값)
+# - scikit-learn / groq / PyMuPDF 는 첫 사용 시 로드되어야 하므로 여기에 잡히면 예산 초과
+# 실행: python benchmarks/bench_import_time.py            (예산 초과 시 종료 코드 1)
+# ================================================================
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# 대상: (이름, import 할 모듈들, 예산 ms)
+# app 은 Streamlit 자체를 제외한 app.py 의 import 목록
+TARGETS = [
+    ("app", ["comparator", "pdf_extractor", "feedback_generator", "retrieval", "instrumentation", "results_store"], 150),
+    ("batch_cli", ["batch_cli"], 150),
+    ("groq_helper_direct_key", ["groq_helper_direct_key"], 150),
+]
+HEAVY_MODULES = ["sklearn", "groq", "httpx", "fitz", "pymupdf", "numpy", "scipy"]
+
+
+def measure_once(modules):
+    code = "import " + ", ".join(modules)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    total_us = 0
+    loaded = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # 머리글 줄
+        loaded.add(name.strip().split(".")[0])
+        if name.rstrip() == f" {name.strip()}" and name.strip() in modules:
+            total_us += int(cumulative)
+    heavy = sorted(m for m in HEAVY_MODULES if m in loaded)
+    return total_us / 1000.0, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="import 시간 측정 및 예산 검사")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: benchmarks/results/import_time_<커밋>.json)")
+    args = parser.parse_args()
+
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                         text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "unknown"
+
+    results = []
+    over_budget = False
+    print(f"{'대상':<24} | {'중앙값(ms)':>10} | {'예산(ms)':>8} | 무거운 모듈")
+    for name, modules, budget in TARGETS:
+        samples, heavy = [], []
+        for _ in range(args.repeat):
+            ms, heavy = measure_once(modules)
+            samples.append(ms)
+        median = round(statistics.median(samples), 1)
+        ok = median <= budget and not heavy
+        over_budget = over_budget or not ok
+        results.append({"target": name, "modules": modules, "median_ms": median,
+                        "samples_ms": samples, "budget_ms": budget, "heavy_modules": heavy, "ok": ok})
+        print(f"{name:<24} | {median:>10.1f} | {budget:>8} | {', '.join(heavy) or '-'}{'' if ok else '  ⚠️ 예산 초과'}")
+
+    report = {"commit": commit, "created": datetime.now().isoformat(timespec="seconds"),
+              "python": sys.version.split()[0], "results": results}
+    output = args.output or os.path.join(RESULTS_DIR, f"import_time_{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 결과 저장: {output}")
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import os
+import sys
+import time
+import random
+import argparse
+from itertools import combinations
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import LINES_PER_PAGE, make_requirements, proposal_lines
+from near_duplicate import NearDuplicateIndex, page_shingles, DEFAULT_THRESHOLD
+
+# ================================================================
+# ⏱️ 유사 페이지 탐지 벤치마크: 전체 쌍 비교(정확한 Jaccard) vs MinHash + LSH
+# - 합성 제안서 텍스트(PDF 렌더링 생략)에 다른 제안서 페이지를 일부 복사해 넣고
+#   두 방식의 시간, 복사 페이지 검출률, 정확한 결과 대비 재현율 비교
+# - 합성 제안서는 요구사항 문장을 공유하므로 임계값 근처(0.4~0.5) 쌍이 많음
+#   → 추정 오차로 경계를 넘나드는 쌍은 "경계" 열에 표시
+# 실행: python benchmarks/bench_near_duplicate.py --proposals 5 10 20 --pages 30
+# ================================================================
+
+
+def build_batch(proposals: int, pages: int, copies: int, seed: int = 0):
+    rng = random.Random(seed)
+    requirements = make_requirements(50, seed)
+    documents = {}
+    for n in range(proposals):
+        lines = proposal_lines(pages, requirements, seed=seed + n * 7)
+        documents[f"제안서_{n:03d}"] = [
+            {"page_number": p + 1, "text": "\n".join(lines[p * LINES_PER_PAGE:(p + 1) * LINES_PER_PAGE])}
+            for p in range(pages)
+        ]
+
+    planted, used = set(), set()
+    names = list(documents)
+    while len(planted) < copies:
+        src, dst = rng.sample(names, 2)
+        p = rng.randrange(pages)
+        if (src, p) in used or (dst, p) in used:
+            continue  # 이미 복사에 쓰인 페이지는 다시 덮어쓰지 않음
+        used.update({(src, p), (dst, p)})
+        documents[dst][p] = {"page_number": p + 1, "text": documents[src][p]["text"]}
+        planted.add(tuple(sorted([(src, p + 1), (dst, p + 1)])))
+    return documents, planted
+
+
+def pairwise(documents, threshold: float):
+    shingles = [((name, page["page_number"]), page_shingles(page["text"]))
+                for name, pages in documents.items() for page in pages]
+    found = set()
+    for (key_a, a), (key_b, b) in combinations(shingles, 2):
+        if key_a[0] != key_b[0] and len(a & b) / len(a | b) >= threshold:
+            found.add(tuple(sorted([key_a, key_b])))
+    return found
+
+
+def lsh(documents, threshold: float):
+    index = NearDuplicateIndex()
+    for name, pages in documents.items():
+        index.add_document(name, pages, threshold=threshold)
+    return {
+        tuple(sorted([(p["문서 A"], p["페이지 A"]), (p["문서 B"], p["페이지 B"])]))
+        for p in index.candidate_pairs(threshold)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="유사 페이지 탐지: 전체 쌍 비교 vs MinHash + LSH")
+    parser.add_argument("--proposals", type=int, nargs="+", default=[5, 10, 20])
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--copies", type=int, default=20)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    print(f"{'제안서':>6} | {'페이지':>7} | {'전체 쌍(s)':>10} | {'LSH(s)':>8} | {'복사 검출':>8} | {'재현율':>6} | {'경계':>4}")
+    for proposals in args.proposals:
+        documents, planted = build_batch(proposals, args.pages, args.copies)
+
+        start = time.perf_counter()
+        exact = pairwise(documents, args.threshold)
+        t_exact = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = lsh(documents, args.threshold)
+        t_lsh = time.perf_counter() - start
+
+        recall = len(found & exact) / len(exact) if exact else 1.0
+        copied = len(found & planted) / len(planted) if planted else 1.0
+        print(f"{proposals:>6} | {proposals * args.pages:>7} | {t_exact:>10.3f} | {t_lsh:>8.3f} | "
+              f"{copied:>8.2f} | {recall:>6.2f} | {len(found ^ exact):>4}")
+
+
+if __name__ == "__main__":
+    main()
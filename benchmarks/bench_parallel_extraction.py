@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import build_corpus
+from pdf_extractor import extract_text_by_page
+
+# ================================================================
+# ⏱️ 페이지 추출 벤치마크: 직렬 vs 병렬 (페이지 수별 속도 향상)
+# 실행: python benchmarks/bench_parallel_extraction.py --pages 50 200 500
+# ================================================================
+
+
+def build_sample_pdf(pages: int) -> bytes:
+    return build_corpus(pages)["proposal_pdf"]
+
+
+def time_call(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="extract_text_by_page 직렬/병렬 비교")
+    parser.add_argument("--pages", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"워커 수: {args.workers} | 청크 크기: {args.chunk_size}")
+    print(f"{'페이지':>6} | {'직렬(s)':>8} | {'병렬(s)':>8} | {'속도 향상':>8}")
+    for pages in args.pages:
+        data = build_sample_pdf(pages)
+        serial = extract_text_by_page(data)
+        parallel = extract_text_by_page(data, workers=args.workers, chunk_size=args.chunk_size)
+        assert serial == parallel, "병렬 추출 결과가 직렬 추출과 다릅니다"
+
+        t_serial = time_call(lambda: extract_text_by_page(data), args.repeat)
+        t_parallel = time_call(
+            lambda: extract_text_by_page(data, workers=args.workers, chunk_size=args.chunk_size), args.repeat
+        )
+        print(f"{pages:>6} | {t_serial:>8.3f} | {t_parallel:>8.3f} | {t_serial / t_parallel:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import random
+from typing import List, Dict
+
+import fitz  # PyMuPDF
+
+# ================================================================
+# 🏭 합성 제안요청서 / 제안서 PDF 생성기 (벤치마크용)
+# - 같은 seed 면 항상 같은 문서 → 커밋 간 결과 비교 가능
+# - 한글은 PyMuPDF 내장 CJK 글꼴(korea) 사용
+# ================================================================
+
+SUBJECTS = ["보안", "데이터", "클라우드", "유지보수", "성과", "품질", "개인정보", "장애", "교육", "인프라",
+            "네트워크", "서버", "백업", "모니터링", "접근통제", "암호화", "연계", "표준", "이행", "검수"]
+ACTIONS = ["관리", "수집", "구축", "운영", "점검", "측정", "개선", "설계", "이관", "대응"]
+OBJECTS = ["방안", "계획", "체계", "절차", "기준", "일정", "지표", "전략", "보고서", "산출물"]
+FILLERS = ["본 사업은", "제안사는", "발주기관과 협의하여", "사업 기간 동안", "관련 법령에 따라",
+           "단계별로", "정기적으로", "필요 시", "주요 업무에 대해", "전 구간에 걸쳐"]
+
+LINES_PER_PAGE = 32
+
+
+def _sentence(rng: random.Random, words: int = 6) -> str:
+    parts = [rng.choice(FILLERS)]
+    for _ in range(words):
+        parts.append(f"{rng.choice(SUBJECTS)} {rng.choice(ACTIONS)} {rng.choice(OBJECTS)}")
+    return " ".join(parts) + "을 제시하여야 함"
+
+
+def make_requirements(count: int, seed: int = 0) -> List[Dict]:
+    """Ⅱ 장 아래 3.1 형식 번호를 가진 요구사항 목록"""
+    rng = random.Random(seed)
+    requirements = []
+    for i in range(count):
+        chapter, item = divmod(i, 9)
+        requirements.append({
+            "number": f"{chapter + 1}.{item + 1}",
+            "title": f"{rng.choice(SUBJECTS)} {rng.choice(ACTIONS)} {rng.choice(OBJECTS)}",
+            "detail": _sentence(rng, 3)
+        })
+    return requirements
+
+
+def rfp_lines(pages: int, requirements: List[Dict], seed: int = 0) -> List[str]:
+    rng = random.Random(seed + 1)
+    lines = ["Ⅱ 제안 요청 내용"]
+    for req in requirements:
+        lines.append(f"{req['number']} {req['title']}")
+        lines.append(req["detail"])
+        lines.append("")
+    while len(lines) < pages * LINES_PER_PAGE:
+        lines.append(_sentence(rng))
+        if rng.random() < 0.2:
+            lines.append("")
+    return lines
+
+
+def proposal_lines(pages: int, requirements: List[Dict], coverage: float = 0.7, seed: int = 0) -> List[str]:
+    rng = random.Random(seed + 2)
+    lines = ["차세대 정보시스템 구축 사업 제안서"]
+    covered = [req for req in requirements if rng.random() < coverage]
+    for req in covered:
+        lines.append(f"{req['title']}에 대한 제안 내용")
+        lines.append(req["detail"].replace("을 제시하여야 함", "을 수행합니다"))
+    while len(lines) < pages * LINES_PER_PAGE:
+        lines.append(_sentence(rng))
+    return lines
+
+
+def build_pdf(lines: List[str], pages: int) -> bytes:
+    doc = fitz.open()
+    for p in range(pages):
+        page = doc.new_page()
+        chunk = lines[p * LINES_PER_PAGE:(p + 1) * LINES_PER_PAGE]
+        # 한 줄씩 넣으면 느리므로 페이지 단위로 텍스트 상자에 삽입
+        page.insert_textbox(fitz.Rect(40, 40, 560, 800), "\n".join(chunk), fontname="korea", fontsize=8)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def build_corpus(pages: int, requirement_count: int = 50, coverage: float = 0.7, seed: int = 0) -> Dict:
+    requirements = make_requirements(requirement_count, seed)
+    return {
+        "pages": pages,
+        "requirements": requirement_count,
+        "rfp_pdf": build_pdf(rfp_lines(pages, requirements, seed), pages),
+        "proposal_pdf": build_pdf(proposal_lines(pages, requirements, coverage, seed), pages),
+    }
@@ -0,0 +1,174 @@
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from corpus import build_corpus
+from pdf_extractor import extract_text_by_page, summarize_pdf_statistics, extract_document_title
+from comparator import compare_documents_v2
+from retrieval import get_best_matching_section
+from rfp_parser import extract_sections_from_text
+import retrieval
+
+# ================================================================
+# 📈 파이프라인 벤치마크
+# - 합성 문서(10 ~ 1,000 페이지)별로 각 단계의 시간(최솟값)과 최대 메모리(tracemalloc) 측정
+# - 결과는 benchmarks/results/<커밋>.json 에 저장, --compare 로 두 결과 비교
+# 실행: python benchmarks/run_benchmarks.py --pages 10 100 1000 --requirements 200
+#       python benchmarks/run_benchmarks.py --compare results/a.json results/b.json
+# ================================================================
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def measure(fn, repeat: int, setup=None) -> dict:
+    best = float("inf")
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(best, 6), "peak_bytes": peak}
+
+
+def clear_retrieval_cache():
+    # 인덱스를 매번 새로 만드는 콜드 경로 측정
+    retrieval._index_memory.clear()
+    shutil.rmtree(retrieval.INDEX_CACHE_DIR, ignore_errors=True)
+
+
+def run_size(pages: int, requirements: int, repeat: int) -> dict:
+    corpus = build_corpus(pages, requirements)
+    rfp_pages = extract_text_by_page(corpus["rfp_pdf"])
+    proposal_pages = extract_text_by_page(corpus["proposal_pdf"])
+    rfp_text = "\n".join(p["text"] for p in rfp_pages)
+    proposal_text = "\n".join(p["text"] for p in proposal_pages)
+    title = extract_document_title(proposal_text)
+    # 비교 대상은 요구사항 줄 전체 (앱의 단일 문단보다 무거운 최악의 경우)
+    request_text = "\n".join(rfp_text.split("\n")[:requirements * 3 + 1])
+
+    stages = {
+        "extract_text_by_page": measure(lambda: extract_text_by_page(corpus["proposal_pdf"]), repeat),
+        "summarize_pdf_statistics": measure(lambda: summarize_pdf_statistics(proposal_pages), repeat),
+        "get_best_matching_section": measure(
+            lambda: get_best_matching_section(rfp_text, title), repeat, setup=clear_retrieval_cache
+        ),
+        "compare_documents_v2": measure(lambda: compare_documents_v2(request_text, proposal_text), repeat),
+        "extract_sections_from_text": measure(lambda: extract_sections_from_text(rfp_text), repeat),
+    }
+    return {"pages": pages, "requirements": requirements, "characters": len(proposal_text), "stages": stages}
+
+
+def run(pages_list, requirements: int, repeat: int) -> dict:
+    workdir = tempfile.mkdtemp(prefix="proposal-bench-")
+    cwd = os.getcwd()
+    os.chdir(workdir)  # .cache 등 부산물이 저장소를 오염시키지 않도록
+    try:
+        sizes = []
+        for pages in pages_list:
+            print(f"▶ {pages} 페이지 측정 중...", flush=True)
+            sizes.append(run_size(pages, requirements, repeat))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "commit": current_commit(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "repeat": repeat,
+        "sizes": sizes,
+    }
+
+
+def print_report(report: dict):
+    print(f"\n커밋 {report['commit']} | Python {report['python']} | CPU {report['cpu_count']}")
+    print(f"{'페이지':>6} | {'단계':<28} | {'시간(s)':>9} | {'최대 메모리(MB)':>14}")
+    for size in report["sizes"]:
+        for name, stage in size["stages"].items():
+            print(f"{size['pages']:>6} | {name:<28} | {stage['seconds']:>9.4f} | "
+                  f"{stage['peak_bytes'] / 1024 / 1024:>14.2f}")
+
+
+def compare_reports(old_path: str, new_path: str, tolerance: float) -> int:
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+
+    old_sizes = {s["pages"]: s for s in old["sizes"]}
+    regressions = 0
+    print(f"{old['commit']} → {new['commit']} (허용 오차 {tolerance:.0%})")
+    print(f"{'페이지':>6} | {'단계':<28} | {'시간 비율':>8} | {'메모리 비율':>9}")
+    for size in new["sizes"]:
+        base = old_sizes.get(size["pages"])
+        if not base:
+            continue
+        for name, stage in size["stages"].items():
+            if name not in base["stages"]:
+                continue
+            before = base["stages"][name]
+            time_ratio = stage["seconds"] / max(before["seconds"], 1e-9)
+            mem_ratio = stage["peak_bytes"] / max(before["peak_bytes"], 1)
+            flag = ""
+            if time_ratio > 1 + tolerance or mem_ratio > 1 + tolerance:
+                flag = "  ⚠️ 회귀"
+                regressions += 1
+            print(f"{size['pages']:>6} | {name:<28} | {time_ratio:>7.2f}x | {mem_ratio:>8.2f}x{flag}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="제안서 피드백 파이프라인 벤치마크")
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--requirements", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: benchmarks/results/<커밋>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="두 결과 JSON 비교")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="회귀로 판단할 증가율")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(compare_reports(args.compare[0], args.compare[1], args.tolerance))
+
+    report = run(args.pages, args.requirements, args.repeat)
+    print_report(report)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 결과 저장: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+from collections import deque
+from typing import List, Dict, Iterable, Optional, Tuple
+
+from instrumentation import stage
+from llm_clients import get_client
+from pdf_extractor import BLANK_PAGE_TEXT
+from rate_limit import estimate_tokens
+from retrieval import ParagraphIndex, get_text_index
+from feedback_generator import estimate_message_tokens
+
+# ================================================================
+# 💬 문서 기반 챗봇의 프롬프트 구성
+# - 업로드한 문서를 페이지 안에서 PASSAGE_CHARS 글자 안팎의 구절로 나눠 문서별 검색 인덱스 생성
+#   (retrieval.get_text_index → 같은 내용의 문서는 메모리/디스크 캐시 재사용)
+# - 질문마다 관련도 상위 구절만 CONTEXT_TOKENS 안에서 주입 → 문서가 커져도 프롬프트 크기 일정
+# - 대화 이력은 HISTORY_TOKENS 안에서 최근 발화만 그대로 유지
+#   → 밀려난 발화는 한 줄 요약으로 남기고, 요약도 SUMMARY_TOKENS 를 넘으면 오래된 줄부터 삭제
+#   (요약을 위한 추가 LLM 호출 없음)
+# ================================================================
+
+CHAT_MODEL = "mixtral-8x7b-32768"
+CHAT_PARAMS = {"temperature": 0.4, "max_tokens": 1024}
+CHAT_SYSTEM_PROMPT = (
+    "당신은 공공 제안서를 잘 작성하는 전문가입니다. "
+    "[참고 문서]에 발췌된 제안요청서 / 제안서 내용을 근거로 답하고, 인용할 때는 (문서명 p.페이지) 형식으로 출처를 밝히세요. "
+    "발췌에 없는 내용은 문서에서 확인할 수 없다고 말한 뒤 일반적인 조언으로 답하세요."
+)
+
+PASSAGE_CHARS = 500        # 구절 하나의 최대 글자 수 (줄 단위로 자름)
+MIN_PASSAGE_LENGTH = 30    # 이보다 짧은 구절(쪽 번호, 머리글 등)은 색인하지 않음
+TOP_K = 5
+MIN_SCORE = 0.05
+CONTEXT_TOKENS = 2000      # 주입할 문서 발췌의 토큰 예산
+HISTORY_TOKENS = 1500      # 그대로 보내는 최근 대화의 토큰 예산
+SUMMARY_TOKENS = 300       # 밀려난 대화 요약의 토큰 예산
+SUMMARY_LINE_CHARS = 80
+
+
+# ------------------------------------------------------------
+# ✂️ 페이지 → 구절
+# ------------------------------------------------------------
+def split_passages(pages: Iterable[Dict], max_chars: int = PASSAGE_CHARS,
+                   min_length: int = MIN_PASSAGE_LENGTH) -> List[Dict]:
+    """
+    빈 줄 또는 max_chars 기준으로 페이지 텍스트를 나눔 (구절은 페이지를 넘지 않음)
+    반환: [{"page", "text"}]
+    """
+    passages = []
+    for i, page in enumerate(pages):
+        if "error" in page or page["text"] == BLANK_PAGE_TEXT:
+            continue
+        number = page.get("page_number", i + 1)
+        current, size = [], 0
+        for line in page["text"].split("\n") + [""]:
+            line = line.strip()
+            if current and (not line or size + len(line) > max_chars):
+                text = "\n".join(current)
+                if len(text) > min_length:
+                    passages.append({"page": number, "text": text})
+                current, size = [], 0
+            if line:
+                current.append(line[:max_chars])
+                size += len(current[-1]) + 1
+    return passages
+
+
+# ------------------------------------------------------------
+# 📚 업로드 문서 검색 (문서별 인덱스)
+# ------------------------------------------------------------
+class DocumentContext:
+    def __init__(self):
+        self.documents: List[Tuple[str, List[Dict], ParagraphIndex]] = []  # (문서명, 구절, 인덱스)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def add_document(self, label: str, pages: Iterable[Dict]):
+        """pages: load_document(...)["pages"]"""
+        with stage("chat.index_document", document=label) as s:
+            passages = split_passages(pages)
+            self.documents.append((label, passages, get_text_index([p["text"] for p in passages])))
+            s.set(passages=len(passages))
+
+    def retrieve(self, query: str, top_k: int = TOP_K, token_budget: int = CONTEXT_TOKENS,
+                 min_score: float = MIN_SCORE) -> List[Dict]:
+        """
+        문서마다 상위 top_k 를 찾아 점수순으로 합친 뒤 top_k 개, token_budget 안에서만 반환
+        반환: [{"문서", "페이지", "점수", "내용"}]
+        """
+        hits = []
+        for label, passages, index in self.documents:
+            for hit in index.query(query, top_k=top_k):
+                if hit["score"] >= min_score:
+                    passage = passages[hit["index"]]
+                    hits.append({"문서": label, "페이지": passage["page"],
+                                 "점수": round(hit["score"], 3), "내용": passage["text"]})
+        hits.sort(key=lambda h: -h["점수"])
+
+        selected, used = [], 0
+        for hit in hits[:top_k]:
+            tokens = estimate_tokens(hit["내용"]) + 8
+            if used + tokens > token_budget:
+                continue  # 긴 구절 하나 때문에 나머지를 버리지 않도록 건너뛰기만 함
+            selected.append(hit)
+            used += tokens
+        return selected
+
+
+def format_passages(passages: List[Dict]) -> str:
+    if not passages:
+        return "[참고 문서]\n(관련 발췌 없음)"
+    blocks = [f"({p['문서']} p.{p['페이지']})\n{p['내용']}" for p in passages]
+    return "[참고 문서]\n" + "\n\n".join(blocks)
+
+
+# ------------------------------------------------------------
+# 🧠 토큰 예산 안의 대화 이력
+# ------------------------------------------------------------
+def _truncate(text: str, tokens: int) -> str:
+    if estimate_tokens(text) <= tokens:
+        return text
+    low, high = 0, len(text)
+    while low < high:  # 예산에 들어가는 가장 긴 앞부분
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) + 1 <= tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low] + "…"
+
+
+class ChatMemory:
+    def __init__(self, token_budget: int = HISTORY_TOKENS, summary_budget: int = SUMMARY_TOKENS):
+        self.token_budget = token_budget
+        self.summary_budget = summary_budget
+        self.turns: "deque[Dict]" = deque()     # {"role", "content", "tokens"}
+        self.summary: "deque[Tuple[str, int]]" = deque()  # (요약 줄, 토큰 수)
+        self.turn_tokens = 0
+        self.summary_tokens = 0
+
+    def add(self, role: str, content: str):
+        content = _truncate(content, self.token_budget)
+        tokens = estimate_message_tokens([{"role": role, "content": content}])
+        self.turns.append({"role": role, "content": content, "tokens": tokens})
+        self.turn_tokens += tokens
+        self._evict()
+
+    def _evict(self):
+        while self.turn_tokens > self.token_budget and len(self.turns) > 1:
+            turn = self.turns.popleft()
+            self.turn_tokens -= turn["tokens"]
+            first_line = turn["content"].strip().split("\n")[0]
+            speaker = "사용자" if turn["role"] == "user" else "답변"
+            line = f"- {speaker}: {first_line[:SUMMARY_LINE_CHARS]}"
+            tokens = estimate_tokens(line) + 1
+            self.summary.append((line, tokens))
+            self.summary_tokens += tokens
+        while self.summary_tokens > self.summary_budget and self.summary:
+            _, tokens = self.summary.popleft()
+            self.summary_tokens -= tokens
+
+    def last_user_message(self) -> Optional[str]:
+        for turn in reversed(self.turns):
+            if turn["role"] == "user":
+                return turn["content"]
+        return None
+
+    def messages(self) -> List[Dict[str, str]]:
+        messages = []
+        if self.summary:
+            lines = "\n".join(line for line, _ in self.summary)
+            messages.append({"role": "system", "content": f"[이전 대화 요약]\n{lines}"})
+        messages.extend({"role": t["role"], "content": t["content"]} for t in self.turns)
+        return messages
+
+
+# ------------------------------------------------------------
+# 🤖 질문 → 답변
+# ------------------------------------------------------------
+def build_chat_messages(question: str, context: Optional[DocumentContext], memory: ChatMemory,
+                        top_k: int = TOP_K) -> Tuple[List[Dict[str, str]], List[Dict]]:
+    """
+    반환: (메시지 목록, 주입한 발췌)
+    후속 질문("그 항목은?")도 찾을 수 있도록 직전 사용자 질문을 검색어에 덧붙임
+    """
+    passages = []
+    if context is not None and len(context):
+        previous = memory.last_user_message()
+        query = f"{previous}\n{question}" if previous else question
+        with stage("chat.retrieve", documents=len(context)) as s:
+            passages = context.retrieve(query, top_k=top_k)
+            s.set(passages=len(passages))
+
+    messages = [{"role": "system", "content": CHAT_SYSTEM_PROMPT}]
+    if context is not None and len(context):
+        messages.append({"role": "system", "content": format_passages(passages)})
+    messages.extend(memory.messages())
+    messages.append({"role": "user", "content": _truncate(question, memory.token_budget)})
+    return messages, passages
+
+
+def answer_question(question: str, context: Optional[DocumentContext], memory: ChatMemory,
+                    top_k: int = TOP_K) -> Dict:
+    """
+    반환: {"답변", "근거", "프롬프트 토큰"} — 질문과 답변은 memory 에 추가됨
+    """
+    messages, passages = build_chat_messages(question, context, memory, top_k)
+    prompt_tokens = estimate_message_tokens(messages)
+    with stage("chat.answer", model=CHAT_MODEL, prompt_tokens=prompt_tokens):
+        response = get_client().chat.completions.create(model=CHAT_MODEL, messages=messages, **CHAT_PARAMS)
+    answer = response.choices[0].message.content.strip()
+
+    memory.add("user", question)
+    memory.add("assistant", answer)
+    return {"답변": answer, "근거": passages, "프롬프트 토큰": prompt_tokens}
@@ -1,8 +1,10 @@
 
 import re
 import json
-from typing import List, Dict
+from typing import List, Dict, Iterable, Optional, Set, Union
+from collections import Counter
 from datetime import datetime
+from instrumentation import stage, instrumented
 
 # ====================================================
 # 📊 comparator.py (확장형)
@@ -29,14 +31,248 @@ def extract_keywords(text: str, stopwords: set = DEFAULT_STOPWORDS) -> List[str]
     words = re.findall(r"[가-힣a-zA-Z0-9]{2,}", text)
     return [word for word in words if word not in stopwords]
 
+# ----------------------------------------------------
+# ⚡ 제안서 단위 키워드 매처 (제안서당 한 번 구축)
+# - 키워드는 [가-힣a-zA-Z0-9] 로만 구성되므로, 제안서 안의 출현 위치는 항상
+#   같은 문자들로 이어진 하나의 "단어 구간" 안에 있음
+# - 서로 다른 단어 구간의 부분 문자열(길이 2~max_len)을 집합으로 만들어 두면
+#   키워드 포함 여부는 집합 조회 한 번 (기존 `word in text` 와 동일한 결과)
+# ----------------------------------------------------
+WORD_RUN_PATTERN = re.compile(r"[가-힣a-zA-Z0-9]+")
+
+
+def match_ratio(matches: int, total: int) -> float:
+    """매칭률 (모든 비교 경로가 같은 반올림을 쓰도록 여기서만 계산)"""
+    return round(matches / total, 2) if total else 0.0
+
+
+class KeywordMatcher:
+    def __init__(self, proposal_text: str = "", max_len: int = 12):
+        self.max_len = max_len
+        self._runs = set()
+        self._substrings = set()
+        # max_len 보다 긴 키워드용: 길이 max_len 조각 → 그 조각을 포함하는 긴 단어 구간들
+        self._long_runs: Dict[str, List[str]] = {}
+        if proposal_text:
+            self.add_text(proposal_text)
+
+    @classmethod
+    def from_pages(cls, pages: Iterable[Dict], max_len: int = 12) -> "KeywordMatcher":
+        matcher = cls(max_len=max_len)
+        for page in pages:
+            matcher.add_text(normalize(page.get("text", "")))
+        return matcher
+
+    def add_text(self, text: str):
+        for run in set(WORD_RUN_PATTERN.findall(text.lower())):
+            if run not in self._runs:
+                self._add_run(run)
+
+    def _add_run(self, run: str) -> Set[str]:
+        max_len = self.max_len
+        self._runs.add(run)
+        n = len(run)
+        substrings = {run[start:end] for start in range(n - 1) for end in range(start + 2, min(start + max_len, n) + 1)}
+        self._substrings |= substrings
+        if n > max_len:
+            for gram in {run[i:i + max_len] for i in range(n - max_len + 1)}:
+                self._long_runs.setdefault(gram, []).append(run)
+        return substrings
+
+    def contains(self, word: str) -> bool:
+        if len(word) <= self.max_len:
+            return word in self._substrings
+        return any(word in run for run in self._long_runs.get(word[:self.max_len], ()))
+
+    def score(self, keywords: List[str]) -> float:
+        matches = sum(1 for word in keywords if self.contains(word))
+        return match_ratio(matches, len(keywords))
+
+    def matching(self, words: Set[str]) -> Set[str]:
+        """words 중 제안서에 포함된 단어 (짧은 단어는 집합 교집합 한 번)"""
+        found = self._substrings & words
+        found.update(word for word in words if len(word) > self.max_len and self.contains(word))
+        return found
+
+
+# ----------------------------------------------------
+# 📍 위치 색인 (근거 페이지 / 위치 조회)
+# - 페이지 레코드로 한 번 구축: 단어 구간 → [(페이지, 위치)], 부분 문자열 → 그것을 포함하는 단어 구간들
+# - 키워드 조회는 키워드가 들어 있는 단어 구간의 출현 위치만 훑음 (제안서 길이와 무관)
+# - 위치는 normalize 한 페이지 텍스트 기준 문자 위치 (evidence_snippet 으로 주변 문맥 표시)
+# - KeywordMatcher 와 같은 포함 판정이므로 check_item / score_matrix 에 그대로 사용 가능
+# ----------------------------------------------------
+MAX_EVIDENCE_PER_KEYWORD = 5
+EVIDENCE_WINDOW_PAGES = 3
+
+
+class PositionalIndex(KeywordMatcher):
+    def __init__(self, max_len: int = 12):
+        super().__init__(max_len=max_len)
+        self.page_numbers: List[int] = []
+        self._ordinals: Dict[int, int] = {}              # 페이지 번호 → 페이지 순번
+        self._postings: Dict[str, List[tuple]] = {}      # 단어 구간 → [(페이지 순번, 위치)] (정렬됨)
+        self._run_pages: Dict[str, List[int]] = {}       # 단어 구간 → 등장 페이지 순번 (중복 없음)
+        self._substring_runs: Dict[str, List[str]] = {}  # 부분 문자열 → 그것을 포함하는 단어 구간
+        self._keyword_pages: Dict[str, "np.ndarray"] = {}
+        self._keyword_postings: Dict[str, List[tuple]] = {}
+
+    @classmethod
+    def from_pages(cls, pages: Iterable[Dict], max_len: int = 12) -> "PositionalIndex":
+        index = cls(max_len=max_len)
+        with stage("comparator.positional_index") as s:
+            for i, page in enumerate(pages):
+                index.add_page(page.get("page_number", i + 1), page.get("text", ""))
+            s.set(pages=len(index.page_numbers), runs=len(index._postings))
+        return index
+
+    def add_text(self, text: str):
+        self.add_page(len(self.page_numbers) + 1, text)
+
+    def add_page(self, page_number: int, text: str):
+        page = len(self.page_numbers)
+        self.page_numbers.append(page_number)
+        self._ordinals.setdefault(page_number, page)
+        self._keyword_pages.clear()
+        self._keyword_postings.clear()
+        for match in WORD_RUN_PATTERN.finditer(normalize(text)):
+            run = match.group()
+            postings = self._postings.get(run)
+            if postings is None:
+                postings = self._postings[run] = []
+                self._run_pages[run] = []
+                for sub in self._add_run(run):
+                    self._substring_runs.setdefault(sub, []).append(run)
+            postings.append((page, match.start()))
+            run_pages = self._run_pages[run]
+            if not run_pages or run_pages[-1] != page:
+                run_pages.append(page)
+
+    def _runs_containing(self, word: str) -> List[str]:
+        if len(word) <= self.max_len:
+            return self._substring_runs.get(word, [])
+        return [run for run in self._long_runs.get(word[:self.max_len], ()) if word in run]
+
+    def keyword_pages(self, word: str) -> "np.ndarray":
+        """키워드가 등장하는 페이지 순번 (정렬, 키워드별로 캐시)"""
+        import numpy as np
+
+        pages = self._keyword_pages.get(word)
+        if pages is None:
+            runs = self._runs_containing(word)
+            if len(runs) == 1:
+                pages = np.asarray(self._run_pages[runs[0]], dtype=np.int64)
+            else:
+                pages = np.unique(np.fromiter((p for run in runs for p in self._run_pages[run]), dtype=np.int64))
+            self._keyword_pages[word] = pages
+        return pages
+
+    def occurrences(self, word: str, pages: Optional[Iterable[int]] = None, limit: Optional[int] = None) -> List[tuple]:
+        """
+        [(페이지 번호, 위치)] — 페이지·위치 순
+        pages: 찾을 페이지 순번 (없으면 전체), limit: 앞에서부터 최대 개수
+        """
+        from bisect import bisect_left
+
+        postings = self._keyword_postings.get(word)
+        if postings is None:
+            postings = []
+            for run in self._runs_containing(word):
+                positions = [i for i in range(len(run) - len(word) + 1) if run.startswith(word, i)]
+                postings.extend((page, offset + p) for page, offset in self._postings[run] for p in positions)
+            postings.sort()
+            self._keyword_postings[word] = postings
+
+        if pages is None:
+            hits = postings if limit is None else postings[:limit]
+        else:
+            hits = []
+            for page in sorted(pages):
+                lo = bisect_left(postings, (page, -1))
+                hi = bisect_left(postings, (page + 1, -1))
+                hits.extend(postings[lo:hi])
+                if limit is not None and len(hits) >= limit:
+                    break
+            if limit is not None:
+                hits = hits[:limit]
+        return [(self.page_numbers[page], offset) for page, offset in hits]
+
+    def evidence(self, keywords: List[str], page_numbers: Optional[Iterable[int]] = None,
+                 window: int = EVIDENCE_WINDOW_PAGES, per_keyword: int = MAX_EVIDENCE_PER_KEYWORD) -> Dict:
+        """
+        키워드별 출현 위치(키워드당 앞에서 per_keyword 개) + 일치 키워드가 가장 많이 모인 연속 window 페이지 구간
+        page_numbers 를 주면 그 페이지들 안에서만 찾음 (섹션 비교의 근거 페이지 등)
+        """
+        import numpy as np
+
+        allowed = None
+        if page_numbers is not None:
+            ordinals = {self._ordinals[n] for n in page_numbers if n in self._ordinals}
+            allowed = np.array(sorted(ordinals), dtype=np.int64)
+
+        matched, hits, pages_by_keyword = [], [], []
+        for word in dict.fromkeys(keywords):
+            pages = self.keyword_pages(word)
+            if allowed is not None and len(pages):
+                # 허용 페이지마다 이진 탐색 (제안서 전체 페이지 수와 무관)
+                found = np.minimum(np.searchsorted(pages, allowed), len(pages) - 1)
+                pages = allowed[pages[found] == allowed]
+            if not len(pages):
+                continue
+            matched.append(word)
+            pages_by_keyword.append(pages)
+            found = self.occurrences(word, pages=None if allowed is None else pages.tolist(), limit=per_keyword)
+            hits.extend({"키워드": word, "페이지": number, "위치": offset} for number, offset in found)
+        return {
+            "일치 키워드": matched,
+            "근거": hits,
+            "근거 구간": self._densest_window(pages_by_keyword, window),
+        }
+
+    def _densest_window(self, pages_by_keyword: List["np.ndarray"], window: int) -> Optional[Dict]:
+        """
+        서로 다른 키워드가 가장 많이 등장하는 연속 window 페이지 (근거가 있는 페이지에서 시작, 동률이면 앞쪽)
+        시작 후보(근거 페이지)마다 키워드별 정렬된 페이지 배열에서 [시작, 시작 + window) 안의 첫 페이지를 이진 탐색
+        → 제안서 전체 페이지 수가 아니라 근거 페이지 수에 비례
+        """
+        import numpy as np
+
+        if not pages_by_keyword:
+            return None
+        starts = np.unique(np.concatenate(pages_by_keyword))
+        counts = np.zeros(len(starts), dtype=np.int32)
+        for pages in pages_by_keyword:
+            first = np.searchsorted(pages, starts)
+            inside = first < len(pages)
+            inside[inside] = pages[first[inside]] < starts[inside] + window
+            counts += inside
+        best = int(np.argmax(counts))
+        start = int(starts[best])
+        return {
+            "시작 페이지": self.page_numbers[start],
+            "끝 페이지": self.page_numbers[min(start + window, len(self.page_numbers)) - 1],
+            "키워드수": int(counts[best]),
+        }
+
+
+def evidence_snippet(page_text: str, offset: int, length: int, width: int = 40) -> str:
+    """근거 위치 주변 문맥 (위치는 normalize 한 페이지 텍스트 기준)"""
+    text = normalize(page_text)
+    start = max(0, offset - width)
+    end = min(len(text), offset + length + width)
+    snippet = text[start:offset] + "【" + text[offset:offset + length] + "】" + text[offset + length:end]
+    return ("…" if start > 0 else "") + " ".join(snippet.split()) + ("…" if end < len(text) else "")
+
+
 # ----------------------------------------------------
 # 📐 키워드 매칭률 계산 함수
 # ----------------------------------------------------
-def keyword_match_score(keywords: List[str], proposal_text: str) -> float:
-    if not keywords:
-        return 0.0
-    matches = sum(1 for word in keywords if word in proposal_text.lower())
-    return round(matches / len(keywords), 2)
+def keyword_match_score(keywords: List[str], proposal_text: Union[str, KeywordMatcher]) -> float:
+    if isinstance(proposal_text, KeywordMatcher):
+        return proposal_text.score(keywords)
+    lowered = proposal_text.lower()
+    matches = sum(1 for word in keywords if word in lowered)
+    return match_ratio(matches, len(keywords))
 
 # ----------------------------------------------------
 # 📊 항목 상태 판단
@@ -52,7 +288,7 @@ def determine_status(score: float, threshold_full: float = 0.9, threshold_partia
 # ----------------------------------------------------
 # 🧠 항목별 비교 실행
 # ----------------------------------------------------
-def check_item(request_item: str, proposal_text: str) -> Dict:
+def check_item(request_item: str, proposal_text: Union[str, KeywordMatcher]) -> Dict:
     keywords = extract_keywords(request_item)
     score = keyword_match_score(keywords, proposal_text)
     status = determine_status(score)
@@ -66,24 +302,374 @@ def check_item(request_item: str, proposal_text: str) -> Dict:
 # ----------------------------------------------------
 # 📋 전체 비교 실행
 # ----------------------------------------------------
-def compare_documents_v2(request_text: str, proposal_text: str) -> List[Dict]:
-    request_lines = [line.strip() for line in request_text.split("\n") if line.strip()]
-    proposal_text = normalize(proposal_text)
-    result = []
+def compare_documents_v2(request_text: str, proposal_text: str,
+                         pages: Optional[Union[Iterable[Dict], PositionalIndex]] = None) -> List[Dict]:
+    """
+    pages(페이지 레코드 또는 미리 만든 PositionalIndex)를 주면 항목마다 근거를 함께 반환
+    - 일치 키워드, 근거 [{"키워드", "페이지", "위치"}], 근거 구간 {"시작 페이지", "끝 페이지", "키워드수"}
+    """
+    with stage("comparator.compare_documents_v2") as s:
+        request_lines = [line.strip() for line in request_text.split("\n") if line.strip()]
+        if pages is None:
+            matcher = KeywordMatcher(normalize(proposal_text))
+        elif isinstance(pages, PositionalIndex):
+            matcher = pages
+        else:
+            matcher = PositionalIndex.from_pages(pages)
+        result = []
+
+        for line in request_lines:
+            item = check_item(line, matcher)
+            if isinstance(matcher, PositionalIndex):
+                item.update(matcher.evidence(extract_keywords(line)))
+            result.append(item)
+
+        s.set(items=len(result), characters=len(proposal_text))
+        return result
+
+# ----------------------------------------------------
+# 🌊 페이지 스트림 기반 비교 (제안서 전체 텍스트를 만들지 않음)
+# - 키워드에는 줄바꿈이 없으므로 페이지 경계를 넘는 매칭은 원래도 발생하지 않음
+# ----------------------------------------------------
+def compare_documents_stream(request_text: str, proposal_pages: Iterable[Dict]) -> List[Dict]:
+    with stage("comparator.compare_documents_stream") as s:
+        request_lines = [line.strip() for line in request_text.split("\n") if line.strip()]
+        matcher = KeywordMatcher.from_pages(proposal_pages)
+        result = [check_item(line, matcher) for line in request_lines]
+        s.set(items=len(result))
+        return result
+
+# ----------------------------------------------------
+# 🗂️ 섹션 단위 비교
+# - RFP 를 번호 체계(Ⅱ-4, 3.1 …)로 섹션 트리로 분해
+# - 섹션 제목+본문과 가장 유사한 제안서 페이지(상위 pages_per_section 장)를 찾고
+# - 섹션의 각 줄은 해당 페이지들에 대해서만 check_item 실행
+# ----------------------------------------------------
+def map_sections_to_pages(sections: List[Dict], proposal_pages: List[Dict],
+                          pages_per_section: int = 3, min_score: float = 0.05) -> List[List[int]]:
+    from retrieval import get_text_index
+
+    page_texts = [p.get("text", "") for p in proposal_pages]
+    index = get_text_index(page_texts)
+    queries = [f"{s['title']}\n{s['body']}" for s in sections]
+    return [
+        [hit["index"] for hit in hits if hit["score"] >= min_score]
+        for hits in index.query_many(queries, top_k=pages_per_section)
+    ]
+
 
-    for line in request_lines:
-        result.append(check_item(line, proposal_text))
+def compare_by_sections(request_text: str, proposal_pages: List[Dict], pages_per_section: int = 3) -> List[Dict]:
+    from rfp_parser import parse_section_tree, iter_sections
 
+    with stage("comparator.parse_sections") as s:
+        sections = list(iter_sections(parse_section_tree(request_text)))
+        s.set(sections=len(sections))
+    if not sections:
+        return []
+
+    with stage("comparator.map_sections_to_pages", sections=len(sections), pages=len(proposal_pages)):
+        section_pages = map_sections_to_pages(sections, proposal_pages, pages_per_section)
+    with stage("comparator.compare_by_sections") as s:
+        result = _check_sections(sections, section_pages, proposal_pages)
+        s.set(sections=len(sections), items=len(result))
+    return result
+
+
+def _check_sections(sections: List[Dict], section_pages: List[List[int]], proposal_pages: List[Dict]) -> List[Dict]:
+    result = []
+    for section, page_indexes in zip(sections, section_pages):
+        matcher = KeywordMatcher.from_pages(proposal_pages[i] for i in page_indexes)
+        evidence_pages = [proposal_pages[i].get("page_number", i + 1) for i in page_indexes]
+        section_name = f"{section['number']} {section['title']}"
+        lines = [section["title"]] + [line for line in section["body"].split("\n") if line.strip()]
+        for line in lines:
+            item = check_item(line, matcher)
+            item["섹션"] = section_name
+            item["근거페이지"] = evidence_pages
+            result.append(item)
     return result
 
+# ----------------------------------------------------
+# 🔁 개정본 증분 재평가
+# - 페이지 지문(pdf_extractor.load_revision 의 page_hashes) → 그 페이지에 있는 RFP 키워드 집합
+# - 새 버전에서는 바뀐/추가된 페이지만 키워드를 계산하고, 영향받는 항목만 다시 채점
+#   · 섹션 비교: 섹션↔페이지 유사도 열을 페이지 지문별로 보관, 새 페이지만 벡터화
+#     (TF-IDF 어휘/IDF 는 기준 버전에 고정, 바뀐 페이지 비율이 refit_ratio 를 넘으면 다시 학습)
+#     근거 페이지 구성이 바뀐 섹션만 다시 채점
+#   · 문단 비교: 키워드별 포함 페이지 수를 유지, 0 ↔ 1 로 바뀐 키워드의 항목만 다시 채점
+# - 결과 형식은 compare_by_sections / compare_documents_v2 와 동일
+# - update() 는 포함여부가 바뀐 항목 목록(변경 내역)을 함께 반환
+# ----------------------------------------------------
+class IncrementalComparison:
+    def __init__(self, request_text: str, fallback_text: Optional[str] = None,
+                 pages_per_section: int = 3, min_score: float = 0.05, refit_ratio: float = 0.2):
+        from rfp_parser import parse_section_tree, iter_sections
+
+        self.pages_per_section = pages_per_section
+        self.min_score = min_score
+        self.refit_ratio = refit_ratio
+        self.sections = list(iter_sections(parse_section_tree(request_text)))
+        self.mode = "sections" if self.sections else "paragraph"
+
+        # 항목 목록: (섹션 번호, 줄) — 섹션 비교는 compare_by_sections 와 같은 순서
+        if self.sections:
+            self.items = []
+            for k, section in enumerate(self.sections):
+                lines = [section["title"]] + [line for line in section["body"].split("\n") if line.strip()]
+                self.items.extend((k, line) for line in lines)
+        else:
+            text = fallback_text if fallback_text is not None else request_text
+            self.items = [(None, line.strip()) for line in text.split("\n") if line.strip()]
+
+        self.item_keywords = [extract_keywords(line) for _, line in self.items]
+        self.keyword_items: Dict[str, Set[int]] = {}
+        self.section_items: Dict[int, List[int]] = {}
+        for i, (k, _) in enumerate(self.items):
+            for word in self.item_keywords[i]:
+                self.keyword_items.setdefault(word, set()).add(i)
+            self.section_items.setdefault(k, []).append(i)
+        self.vocabulary = set(self.keyword_items)
+
+        self.page_hashes: List[str] = []
+        self.page_keywords: Dict[str, Set[str]] = {}
+        self.keyword_pages: Counter = Counter()
+        self.results: List[Dict] = []
+        # 섹션 비교용 상태
+        self._index = None
+        self._section_vectors = None
+        self._columns: Dict = {}
+        self._section_pages: List[tuple] = []
+
+    def _keywords_of(self, h: str, text: str) -> Set[str]:
+        found = self.page_keywords.get(h)
+        if found is None:
+            found = self.page_keywords[h] = KeywordMatcher(normalize(text)).matching(self.vocabulary)
+        return found
+
+    def _score_item(self, i: int, present) -> Dict:
+        keywords = self.item_keywords[i]
+        matches = sum(1 for word in keywords if word in present)
+        score = match_ratio(matches, len(keywords))
+        return {
+            "항목": self.items[i][1].strip(),
+            "키워드수": len(keywords),
+            "매칭률": score,
+            "포함여부": determine_status(score)
+        }
+
+    def update(self, pages: List[Dict], page_hashes: List[str]) -> Dict:
+        """
+        새 버전(첫 호출이면 기준 버전)으로 갱신
+        반환: {"결과", "변경", "재평가 항목 수", "변경 페이지 수"}
+        """
+        with stage("comparator.incremental_update", mode=self.mode, pages=len(pages)) as s:
+            old_counts, new_counts = Counter(self.page_hashes), Counter(page_hashes)
+            # 바뀐 페이지는 삭제(이전 지문) + 추가(새 지문) 양쪽에 잡히므로 큰 쪽만 셈 (페이지당 1)
+            changed_pages = max(sum((old_counts - new_counts).values()), sum((new_counts - old_counts).values()))
+            first = not self.results
+
+            if self.mode == "sections":
+                refit = changed_pages > self.refit_ratio * max(len(pages), 1)
+                affected = self._update_sections(pages, page_hashes, first, refit)
+            else:
+                affected = self._update_paragraph(pages, page_hashes, old_counts, new_counts, first)
+            self.page_hashes = list(page_hashes)
+            for h in set(self.page_keywords) - set(new_counts):
+                del self.page_keywords[h]
+
+            changes = []
+            for i, item in affected:
+                if not first and item["포함여부"] != self.results[i]["포함여부"]:
+                    change = {"항목": item["항목"]}
+                    if "섹션" in item:
+                        change["섹션"] = item["섹션"]
+                    change.update({
+                        "이전 포함여부": self.results[i]["포함여부"],
+                        "포함여부": item["포함여부"],
+                        "이전 매칭률": self.results[i]["매칭률"],
+                        "매칭률": item["매칭률"],
+                    })
+                    changes.append(change)
+                if first:
+                    self.results.append(item)
+                else:
+                    self.results[i] = item
+
+            s.set(changed_pages=changed_pages, rescored=len(affected), status_changes=len(changes))
+            return {
+                "결과": self.results,
+                "변경": changes,
+                "재평가 항목 수": len(affected),
+                "변경 페이지 수": changed_pages,
+            }
+
+    def _update_paragraph(self, pages, page_hashes, old_counts, new_counts, first):
+        touched = set()
+        for h, count in (old_counts - new_counts).items():
+            for word in self.page_keywords[h]:
+                self.keyword_pages[word] -= count
+                if self.keyword_pages[word] <= 0:
+                    del self.keyword_pages[word]
+                    touched.add(word)
+        added = new_counts - old_counts
+        for h, page in zip(page_hashes, pages):
+            count = added.pop(h, 0)
+            if not count:
+                continue
+            for word in self._keywords_of(h, page.get("text", "")):
+                if word not in self.keyword_pages:
+                    touched.add(word)
+                self.keyword_pages[word] += count
+
+        if first:
+            rescore = range(len(self.items))
+        else:
+            rescore = sorted({i for word in touched for i in self.keyword_items[word]})
+        return [(i, self._score_item(i, self.keyword_pages)) for i in rescore]
+
+    def _update_sections(self, pages, page_hashes, first, refit):
+        import numpy as np
+        from retrieval import get_text_index, top_indices
+
+        texts = [p.get("text", "") for p in pages]
+        fitted = self._index is None or refit
+        if fitted:
+            self._index = get_text_index(texts)
+            self._columns = {}
+            queries = [f"{sec['title']}\n{sec['body']}" for sec in self.sections]
+            self._section_vectors = self._index.vectorizer.transform(queries)
+
+        new_hashes = [h for h in dict.fromkeys(page_hashes) if h not in self._columns]
+        if new_hashes:
+            positions = {h: j for j, h in enumerate(page_hashes)}
+            if fitted:
+                block = self._index.matrix[[positions[h] for h in new_hashes]]
+            else:
+                block = self._index.vectorizer.transform([texts[positions[h]] for h in new_hashes])
+            scores = (self._section_vectors @ block.T).toarray()
+            for j, h in enumerate(new_hashes):
+                self._columns[h] = scores[:, j]
+        live = set(page_hashes)
+        for h in set(self._columns) - live:
+            del self._columns[h]
+
+        similarity = np.column_stack([self._columns[h] for h in page_hashes]) if page_hashes else None
+        k = min(self.pages_per_section, len(page_hashes))
+        affected = []
+        for n, section in enumerate(self.sections):
+            if similarity is None:
+                indexes = []
+            else:
+                row = similarity[n]
+                indexes = [j for j in top_indices(row, k) if row[j] >= self.min_score]
+            key = tuple((pages[j].get("page_number", j + 1), page_hashes[j]) for j in indexes)
+            if not first and key == self._section_pages[n]:
+                continue
+            if first:
+                self._section_pages.append(key)
+            else:
+                self._section_pages[n] = key
+
+            present = set()
+            for j in indexes:
+                present |= self._keywords_of(page_hashes[j], texts[j])
+            section_name = f"{section['number']} {section['title']}"
+            evidence_pages = [number for number, _ in key]
+            for i in self.section_items[n]:
+                item = self._score_item(i, present)
+                item["섹션"] = section_name
+                item["근거페이지"] = evidence_pages
+                affected.append((i, item))
+        return affected
+
+
+# ----------------------------------------------------
+# 🧮 다중 제안서 일괄 채점 (RFP 항목 × 제안서 점수 행렬)
+# - 항목×키워드 희소 행렬 A (키워드 중복 횟수 포함) 는 한 번만 구성
+# - 제안서마다 키워드 포함 여부 벡터를 만들어 키워드×제안서 행렬 P 구성
+# - 매칭 수 = A @ P, 매칭률 = 매칭 수 / 키워드 수 → 상태는 벡터 연산으로 판정
+# ----------------------------------------------------
+@instrumented("comparator.score_matrix")
+def score_matrix(request_text: str, proposals: Dict[str, Union[str, KeywordMatcher]],
+                 threshold_full: float = 0.9, threshold_partial: float = 0.4) -> List[Dict]:
+    import numpy as np
+    from scipy import sparse
+
+    request_lines = [line.strip() for line in request_text.split("\n") if line.strip()]
+    item_keywords = [extract_keywords(line) for line in request_lines]
+
+    vocabulary: Dict[str, int] = {}
+    rows, cols = [], []
+    for i, keywords in enumerate(item_keywords):
+        for word in keywords:
+            rows.append(i)
+            cols.append(vocabulary.setdefault(word, len(vocabulary)))
+    item_term = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+        shape=(len(request_lines), len(vocabulary))
+    )
+
+    names = list(proposals)
+    terms = list(vocabulary)
+    presence_rows, presence_cols = [], []
+    for j, name in enumerate(names):
+        matcher = proposals[name]
+        if not isinstance(matcher, KeywordMatcher):
+            matcher = KeywordMatcher(normalize(matcher))
+        for t, word in enumerate(terms):
+            if matcher.contains(word):
+                presence_rows.append(t)
+                presence_cols.append(j)
+    term_proposal = sparse.csr_matrix(
+        (np.ones(len(presence_rows), dtype=np.int32), (presence_rows, presence_cols)),
+        shape=(len(terms), len(names))
+    )
+
+    matches = (item_term @ term_proposal).toarray()
+    keyword_counts = np.array([len(k) for k in item_keywords], dtype=np.int32)[:, None]
+    # np.round 는 0.025 → 0.02 처럼 Python round 와 결과가 달라 항목별 비교와 어긋나므로 match_ratio 사용
+    # → 서로 다른 (일치 수, 키워드 수) 쌍마다 한 번만 계산해 행렬로 되돌림
+    pairs = np.stack([matches.ravel(), np.broadcast_to(keyword_counts, matches.shape).ravel()], axis=1)
+    distinct, inverse = np.unique(pairs, axis=0, return_inverse=True)
+    ratios = np.array([match_ratio(int(m), int(n)) for m, n in distinct], dtype=np.float64)
+    scores = ratios[inverse.ravel()].reshape(matches.shape)
+    statuses = np.select(
+        [scores >= threshold_full, scores >= threshold_partial],
+        ["포함됨", "부분 포함"],
+        default="누락됨"
+    )
+
+    table = []
+    for i, line in enumerate(request_lines):
+        for j, name in enumerate(names):
+            table.append({
+                "항목": line,
+                "제안서": name,
+                "키워드수": int(keyword_counts[i, 0]),
+                "매칭률": float(scores[i, j]),
+                "포함여부": str(statuses[i, j])
+            })
+    return table
+
 # ----------------------------------------------------
 # 📝 JSON 로그 저장
 # ----------------------------------------------------
-def save_log(results: List[Dict], filename: str = "compare_log.json"):
-    now = datetime.now().strftime("%Y%m%d_%H%M%S")
-    full_name = f"{filename.replace('.json', '')}_{now}.json"
-    with open(full_name, "w", encoding="utf-8") as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+def save_log(results: List[Dict], filename: str = "compare_log.json", legacy_json: bool = False,
+             source: str = "compare", **run_fields) -> str:
+    """
+    비교 결과를 평가 이력 저장소(results_store)에 기록하고 run_id 반환 (기록은 백그라운드에서 진행)
+    run_fields: proposal_name, proposal_hash, rfp_name, rfp_hash, mode, timings
+    legacy_json=True 이면 예전처럼 시각이 붙은 JSON 파일도 함께 저장
+    """
+    from results_store import get_results_store
+
+    run_id = get_results_store().record_run(results, source=source, **run_fields)
+    if legacy_json:
+        now = datetime.now().strftime("%Y%m%d_%H%M%S")
+        full_name = f"{filename.replace('.json', '')}_{now}.json"
+        with open(full_name, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return run_id
 
 # ----------------------------------------------------
 # 🧪 유닛 테스트 실행
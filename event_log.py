@@ -0,0 +1,28 @@
+import logging
+from logging.handlers import RotatingFileHandler
+
+# 📁 로깅 설정 (파일 핸들은 한 번만 열어 재사용, 크기 상한을 넘으면 .1 ~ .3 으로 교체)
+# 평가 결과와 피드백 본문은 results_store 에 기록하고, 이 파일에는 진행 상황만 남김
+LOG_PATH = "feedback_log.txt"
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+
+_logger = None
+
+
+def _get_logger() -> logging.Logger:
+    global _logger
+    if _logger is None:
+        logger = logging.getLogger("proposal.feedback")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        handler = RotatingFileHandler(LOG_PATH, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS,
+                                      encoding="utf-8", delay=True)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s", datefmt="[%Y-%m-%d %H:%M:%S]"))
+        logger.addHandler(handler)
+        _logger = logger
+    return _logger
+
+
+def log_event(message: str):
+    _get_logger().info(message)
@@ -1,19 +1,24 @@
-import streamlit as st
 import time
 import logging
-from typing import List, Dict
-from datetime import datetime
-from groq import Groq
+from typing import List, Dict, Iterator
+from event_log import LOG_PATH, log_event
+from llm_cache import cached_completion, make_cache_key, get_llm_cache
+from rate_limit import estimate_tokens
+from instrumentation import stage, record, bind_run
+from concurrent.futures import ThreadPoolExecutor
+from llm_clients import get_client
 
 # ================================================================
 # 🛠️ Groq 기반 피드백 생성기 (Streamlit secrets.toml 버전)
 # ================================================================
 
-# 🔐 secrets.toml에서 API 키 불러오기
-GROQ_API_KEY = st.secrets["groq_api_key"]
+# 🔐 API 키(secrets.toml 의 groq_api_key)와 Groq 클라이언트는 첫 호출 시 llm_clients 에서 준비
 
-# 🤖 Groq API 클라이언트 초기화
-client = Groq(api_key=GROQ_API_KEY)
+# ⚙️ 피드백 생성 파라미터
+FEEDBACK_MODEL = "llama3-8b-8192"  # 또는 llama3-70b-8192
+FEEDBACK_PARAMS = {"temperature": 0.65, "max_tokens": 2000, "top_p": 1}
+CONTEXT_WINDOW = 8192
+PROMPT_MARGIN = 200  # 토큰 추정 오차 여유분
 
 # 📋 메시지 포맷 생성 함수
 def build_messages(prompt: str) -> List[Dict[str, str]]:
@@ -33,6 +38,10 @@ def build_messages(prompt: str) -> List[Dict[str, str]]:
         }
     ]
 
+# 🔑 피드백 응답의 LLM 캐시 키 (평가 이력에서 피드백 원문을 참조할 때 사용)
+def feedback_cache_key(prompt: str) -> str:
+    return make_cache_key(FEEDBACK_MODEL, build_messages(prompt), **FEEDBACK_PARAMS)
+
 # 🧼 프롬프트 클린징
 def clean_prompt(prompt: str) -> str:
     cleaned = prompt.replace("\n\n", "\n").strip()
@@ -59,15 +68,9 @@ def validate_prompt(prompt: str) -> bool:
         return False
     return True
 
-# 📁 로깅 설정
-LOG_PATH = "feedback_log.txt"
-def log_event(message: str):
-    with open(LOG_PATH, "a", encoding="utf-8") as f:
-        timestamp = datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
-        f.write(f"{timestamp} {message}\n")
 
 # 🤖 피드백 생성 함수
-def generate_feedback(prompt: str, debug: bool = False) -> str:
+def generate_feedback(prompt: str, debug: bool = False, use_cache: bool = True) -> str:
     if not validate_prompt(prompt):
         return "❌ 유효하지 않은 프롬프트 형식입니다. 항목별 ‘→ 포함 상태’ 형식을 따르세요."
 
@@ -75,17 +78,18 @@ def generate_feedback(prompt: str, debug: bool = False) -> str:
         messages = build_messages(prompt)
         start_time = time.time()
 
-        response = client.chat.completions.create(
-            model="llama3-8b-8192",  # 또는 llama3-70b-8192
-            messages=messages,
-            temperature=0.65,
-            max_tokens=2000,
-            top_p=1,
-            stop=None
-        )
+        # 동일한 요청(모델/메시지/파라미터)은 디스크 캐시에서 즉시 반환
+        with stage("feedback.generate", prompt_tokens=estimate_message_tokens(messages)):
+            content = cached_completion(
+                get_client(),
+                model=FEEDBACK_MODEL,
+                messages=messages,
+                bypass=not use_cache,
+                log=log_event,
+                **FEEDBACK_PARAMS
+            )
 
         elapsed = round(time.time() - start_time, 2)
-        content = response.choices[0].message.content.strip()
 
         log_event(f"피드백 생성 성공 (소요 시간: {elapsed}s)")
 
@@ -96,3 +100,161 @@ def generate_feedback(prompt: str, debug: bool = False) -> str:
     except Exception as e:
         log_event(f"⚠️ 피드백 생성 실패: {e}")
         return f"❌ 피드백 생성 중 오류가 발생했습니다: {e}"
+
+
+# 🌊 피드백 스트리밍 생성 함수 (토큰이 도착하는 대로 반환, st.write_stream 용)
+def generate_feedback_stream(prompt: str, debug: bool = False, use_cache: bool = True) -> Iterator[str]:
+    if not validate_prompt(prompt):
+        yield "❌ 유효하지 않은 프롬프트 형식입니다. 항목별 ‘→ 포함 상태’ 형식을 따르세요."
+        return
+
+    try:
+        messages = build_messages(prompt)
+        start_time = time.time()
+        cache = get_llm_cache()
+        key = feedback_cache_key(prompt)
+
+        if debug:
+            yield "=== [디버그 모드] ===\n"
+
+        content = cache.get(key) if use_cache else None
+        if content is not None:
+            elapsed = round(time.time() - start_time, 2)
+            record("feedback.stream", cache="hit", first_token_s=elapsed, wall_s=elapsed)
+            log_event(f"LLM 캐시 적중 ({FEEDBACK_MODEL}) | {cache.stats()}")
+            log_event(f"피드백 생성 성공 (캐시, 소요 시간: {elapsed}s)")
+            yield content
+            if debug:
+                yield f"\n\n⏱ 처리 시간: {elapsed}s (캐시)"
+            return
+
+        stream = get_client().chat.completions.create(
+            model=FEEDBACK_MODEL,
+            messages=messages,
+            stream=True,
+            **FEEDBACK_PARAMS
+        )
+
+        parts = []
+        first_token = None
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if not delta:
+                continue
+            if first_token is None:
+                first_token = round(time.time() - start_time, 2)
+            parts.append(delta)
+            yield delta
+
+        elapsed = round(time.time() - start_time, 2)
+        content = "".join(parts).strip()
+        cache.put(key, FEEDBACK_MODEL, content)
+        record("feedback.stream", cache="miss", first_token_s=first_token, wall_s=elapsed)
+
+        log_event(f"피드백 스트리밍 성공 (첫 토큰: {first_token}s, 소요 시간: {elapsed}s)")
+
+        if debug:
+            yield f"\n\n⏱ 첫 토큰: {first_token}s | 처리 시간: {elapsed}s"
+
+    except Exception as e:
+        log_event(f"⚠️ 피드백 생성 실패: {e}")
+        yield f"❌ 피드백 생성 중 오류가 발생했습니다: {e}"
+
+
+# ================================================================
+# 🧩 대용량 비교 결과용 맵-리듀스 피드백
+# - 시스템 프롬프트 + 출력 예산(max_tokens) 을 제외한 토큰 예산 안에 들어가도록 항목을 묶음으로 분할
+# - 묶음별 피드백은 동시에 생성(map), 마지막에 하나의 보고서로 통합(reduce)
+# ================================================================
+REDUCE_SYSTEM_PROMPT = (
+    "당신은 대한민국 공공기관의 제안서 심사위원장입니다. "
+    "아래는 제안요청서 항목을 여러 묶음으로 나누어 작성한 심사 피드백입니다. "
+    "중복을 제거하고 누락됨 → 부분 포함 → 포함됨 순으로 정리하여 하나의 일관된 보고서로 통합해 주세요. "
+    "항목별 판단은 그대로 유지하고, 말투는 공손하지만 분석적이어야 합니다."
+)
+
+
+def estimate_message_tokens(messages: List[Dict[str, str]]) -> int:
+    # 메시지당 역할/구분자 오버헤드 4토큰
+    return sum(estimate_tokens(m["content"]) + 4 for m in messages)
+
+
+def prompt_token_budget(system_prompt: str) -> int:
+    system_tokens = estimate_message_tokens([{"role": "system", "content": system_prompt}])
+    return CONTEXT_WINDOW - FEEDBACK_PARAMS["max_tokens"] - system_tokens - PROMPT_MARGIN
+
+
+def chunk_lines(lines: List[str], budget: int) -> List[List[str]]:
+    chunks, current, used = [], [], 0
+    for line in lines:
+        tokens = estimate_tokens(line) + 1
+        if current and used + tokens > budget:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(line)
+        used += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _complete(messages: List[Dict[str, str]], use_cache: bool) -> str:
+    return cached_completion(
+        get_client(),
+        model=FEEDBACK_MODEL,
+        messages=messages,
+        bypass=not use_cache,
+        log=log_event,
+        **FEEDBACK_PARAMS
+    )
+
+
+def _reduce_messages(partials: List[str]) -> List[Dict[str, str]]:
+    body = "\n\n".join(f"[묶음 {i + 1}]\n{text}" for i, text in enumerate(partials))
+    return [
+        {"role": "system", "content": REDUCE_SYSTEM_PROMPT},
+        {"role": "user", "content": body}
+    ]
+
+
+def needs_batching(prompt: str) -> bool:
+    return estimate_message_tokens(build_messages(prompt)) + FEEDBACK_PARAMS["max_tokens"] > CONTEXT_WINDOW - PROMPT_MARGIN
+
+
+def generate_feedback_map_reduce(prompt: str, max_workers: int = 4, use_cache: bool = True) -> str:
+    if not validate_prompt(prompt):
+        return "❌ 유효하지 않은 프롬프트 형식입니다. 항목별 ‘→ 포함 상태’ 형식을 따르세요."
+    if not needs_batching(prompt):
+        return generate_feedback(prompt, use_cache=use_cache)
+
+    try:
+        start_time = time.time()
+        system_prompt = build_messages("")[0]["content"]
+        lines = [line for line in clean_prompt(prompt).split("\n") if line.strip()]
+        chunks = chunk_lines(lines, prompt_token_budget(system_prompt))
+
+        # 🗺️ map: 묶음별 피드백 동시 생성
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            partials = list(pool.map(
+                bind_run(lambda chunk: _complete(build_messages("\n".join(chunk)), use_cache)), chunks
+            ))
+        map_elapsed = round(time.time() - start_time, 2)
+
+        # 🧮 reduce: 통합 입력이 예산을 넘으면 여러 단계로 나누어 통합
+        reduce_budget = prompt_token_budget(REDUCE_SYSTEM_PROMPT)
+        while len(partials) > 1:
+            groups = chunk_lines(partials, reduce_budget)
+            if len(groups) == len(partials) and len(partials) > 1:
+                # 묶음 하나가 예산을 넘는 경우에도 진행되도록 두 개씩 통합
+                groups = [partials[i:i + 2] for i in range(0, len(partials), 2)]
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                partials = list(pool.map(bind_run(lambda group: _complete(_reduce_messages(group), use_cache)), groups))
+
+        elapsed = round(time.time() - start_time, 2)
+        record("feedback.map_reduce", chunks=len(chunks), items=len(lines), map_s=map_elapsed, wall_s=elapsed)
+        log_event(f"맵-리듀스 피드백 생성 성공 (묶음 {len(chunks)}개, map: {map_elapsed}s, 전체: {elapsed}s)")
+        return partials[0]
+
+    except Exception as e:
+        log_event(f"⚠️ 맵-리듀스 피드백 생성 실패: {e}")
+        return f"❌ 피드백 생성 중 오류가 발생했습니다: {e}"
@@ -1,9 +1,19 @@
-from groq import Groq
+import asyncio
+import random
+from event_log import log_event
+from llm_clients import get_client, get_async_client
+from llm_cache import cached_completion, make_cache_key, get_llm_cache
+from rate_limit import TokenBucket, estimate_tokens
 
-# ⚠️ 여기에 직접 Groq 키를 입력하세요 (Streamlit에서는 secrets 사용 권장)
-client = Groq(api_key="")
+# ⚠️ 여기에 직접 Groq 키를 입력하세요 (비워 두면 환경 변수 / Streamlit secrets 사용)
+GROQ_API_KEY = ""
 
-def analyze_section_with_groq(section_text, index):
+SECTION_MODEL = "mixtral-8x7b-32768"
+SECTION_TEMPERATURE = 0.4
+SECTION_MAX_TOKENS = 1024  # 동기 / 비동기 경로가 같은 캐시 키를 쓰도록 두 경로 모두 이 값 사용
+
+
+def build_section_messages(section_text, index):
     section_text = section_text.encode("utf-8", "ignore").decode("utf-8")  # ✅ 한글 인코딩 문제 해결
     prompt = f"""
     [제안요청 항목 {index+1}]
@@ -13,12 +23,163 @@ def analyze_section_with_groq(section_text, index):
     위 항목에 대해 제안서를 쓸 때 어떤 내용을 넣으면 좋을지 구체적인 예시 문장으로 알려줘.
     반드시 항목에 어울리는 내용으로만 작성하고, 중복되거나 추상적인 내용은 빼줘.
     """
-    response = client.chat.completions.create(
-        model="mixtral-8x7b-32768",
-        messages=[
-            {"role": "system", "content": "당신은 공공사업 제안서를 전문적으로 작성하는 전문가입니다."},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0.4,
+    return [
+        {"role": "system", "content": "당신은 공공사업 제안서를 전문적으로 작성하는 전문가입니다."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def analyze_section_with_groq(section_text, index, use_cache=True, max_tokens=SECTION_MAX_TOKENS):
+    return cached_completion(
+        get_client(GROQ_API_KEY),
+        model=SECTION_MODEL,
+        messages=build_section_messages(section_text, index),
+        temperature=SECTION_TEMPERATURE,
+        max_tokens=max_tokens,
+        bypass=not use_cache,
+        log=log_event
     )
-    return response.choices[0].message.content.strip()
+
+
+# ------------------------------------------------------------
+# ⚡ 여러 섹션 동시 분석 (asyncio)
+# - 동시 요청 수 제한 + RPM/TPM 토큰 버킷
+# - 429 / 5xx / 연결 오류는 지터가 들어간 지수 백오프로 재시도
+# - 결과는 항상 입력 섹션 순서, progress(완료 수, 전체 수) 는 섹션이 끝날 때마다 호출
+# ------------------------------------------------------------
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def _retry_delay(attempt, error, base_delay, max_delay):
+    retry_after = None
+    response = getattr(error, "response", None)
+    if response is not None:
+        retry_after = response.headers.get("retry-after")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+async def analyze_sections_async(sections, async_client=None, max_concurrency=4,
+                                 requests_per_minute=30, tokens_per_minute=5000, max_tokens=SECTION_MAX_TOKENS,
+                                 max_retries=5, base_delay=1.0, max_delay=30.0,
+                                 progress=None, use_cache=True):
+    from groq import APIStatusError, APIConnectionError
+
+    async_client = async_client or get_async_client(GROQ_API_KEY, max_retries=0)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    request_bucket = TokenBucket(requests_per_minute)
+    token_bucket = TokenBucket(tokens_per_minute)
+    cache = get_llm_cache()
+    results = [None] * len(sections)
+    done = 0
+
+    async def analyze(i, section_text):
+        nonlocal done
+        messages = build_section_messages(section_text, i)
+        key = make_cache_key(SECTION_MODEL, messages, SECTION_TEMPERATURE, None, max_tokens)
+        content = cache.get(key) if use_cache else None
+
+        attempt = 0
+        while content is None:
+            async with semaphore:
+                await request_bucket.acquire(1)
+                await token_bucket.acquire(sum(estimate_tokens(m["content"]) for m in messages) + max_tokens)
+                try:
+                    response = await async_client.chat.completions.create(
+                        model=SECTION_MODEL,
+                        messages=messages,
+                        temperature=SECTION_TEMPERATURE,
+                        max_tokens=max_tokens
+                    )
+                    content = response.choices[0].message.content.strip()
+                    cache.put(key, SECTION_MODEL, content)
+                    break
+                except (APIStatusError, APIConnectionError) as e:
+                    status = getattr(e, "status_code", None)
+                    retryable = isinstance(e, APIConnectionError) or status in RETRYABLE_STATUS
+                    if not retryable or attempt >= max_retries:
+                        log_event(f"⚠️ 섹션 {i + 1} 분석 실패: {e}")
+                        content = f"❌ 섹션 분석 중 오류가 발생했습니다: {e}"
+                        break
+                    delay = _retry_delay(attempt, e, base_delay, max_delay)
+            attempt += 1
+            # 대기는 세마포어 밖에서 (다른 섹션 요청을 막지 않도록)
+            await asyncio.sleep(delay)
+
+        results[i] = content
+        done += 1
+        if progress:
+            progress(done, len(sections))
+
+    await asyncio.gather(*(analyze(i, text) for i, text in enumerate(sections)))
+    log_event(f"섹션 일괄 분석 완료 ({len(sections)}개) | 캐시 {cache.stats()}")
+    return results
+
+
+def analyze_sections(sections, **kwargs):
+    """
+    동기 코드(Streamlit 등)에서 호출하는 래퍼
+    예) bar = st.progress(0); analyze_sections(texts, progress=lambda d, t: bar.progress(d / t))
+    """
+    return asyncio.run(analyze_sections_async(sections, **kwargs))
+
+
+# ------------------------------------------------------------
+# ▶️ 로컬 스텁 서버로 동작 확인 (직접 실행 시)
+# - /openai/v1/chat/completions 를 흉내 내며 처음 몇 번은 429 를 돌려줌
+# ------------------------------------------------------------
+if __name__ == "__main__":
+    import json
+    import tempfile
+    import threading
+    import llm_cache
+    from groq import AsyncGroq
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    state = {"requests": 0}
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            state["requests"] += 1
+            if state["requests"] <= 2:
+                self.send_response(429)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("retry-after", "0.1")
+                self.end_headers()
+                self.wfile.write(b'{"error": {"message": "rate limited"}}')
+                return
+            text = body["messages"][-1]["content"].split("]")[0].strip() + "] 예시 문장"
+            payload = {
+                "id": "stub", "object": "chat.completion", "created": 0, "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": text}}],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+            }
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    llm_cache._llm_cache = llm_cache.LLMCache(path=f"{tempfile.mkdtemp()}/llm.sqlite")
+
+    stub_client = AsyncGroq(api_key="stub", base_url=f"http://127.0.0.1:{server.server_port}", max_retries=0)
+    sections = [f"3.{i} 요구사항 {i}" for i in range(1, 9)]
+    outputs = analyze_sections(sections, async_client=stub_client, requests_per_minute=600,
+                               tokens_per_minute=100000, base_delay=0.05,
+                               progress=lambda d, t: print(f"진행 {d}/{t}"))
+    for i, out in enumerate(outputs):
+        assert f"[제안요청 항목 {i + 1}]" in out, out
+    print(f"✅ 순서 보존 확인, 총 요청 {state['requests']}회 (429 재시도 포함)")
+    server.shutdown()
@@ -0,0 +1,271 @@
+import os
+import json
+import time
+import uuid
+import atexit
+import contextvars
+import threading
+import functools
+import tracemalloc
+from collections import deque
+from typing import List, Dict, Optional
+
+# ================================================================
+# ⏱️ 단계별 성능 계측
+# - with stage("pdf.extract", pages=10): ... / @instrumented("comparator.compare")
+# - 벽시계 시간, CPU 시간, 최대 메모리(tracemalloc), 페이지·항목 수, 캐시 적중 여부 기록
+# - 기록은 버퍼에 모았다가 JSONL 파일에 한꺼번에 기록
+# - 꺼져 있으면 stage() 는 아무 일도 하지 않는 공용 객체를 돌려줌 (오버헤드 거의 없음)
+# - tracemalloc 최대치는 프로세스 전체에 하나뿐 → 다른 스레드의 구간과 겹친 구간은
+#   peak_mem_bytes 대신 mem_concurrent=true 만 기록 (Streamlit 세션, 스레드 풀)
+# - start_run() 으로 실행 id 를 정하면 그 뒤 기록에 run_id 가 붙음 (contextvars → 세션/스레드별)
+#   → recent_records(run_id=...) 로 다른 세션의 기록과 섞이지 않게 조회
+#   → 스레드 풀에 넘기는 함수는 bind_run() 으로 감싸야 같은 실행으로 기록됨
+# 켜기: 환경 변수 PROPOSAL_PERF=1 (메모리 추적 끄기: PROPOSAL_PERF_MEMORY=0) 또는 enable()
+# ================================================================
+
+PERF_LOG_PATH = "perf_log.jsonl"
+FLUSH_EVERY = 50
+
+
+class JsonlSink:
+    def __init__(self, path: str = PERF_LOG_PATH, flush_every: int = FLUSH_EVERY):
+        self.path = path
+        self.flush_every = flush_every
+        self._buffer: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def write(self, record: Dict):
+        with self._lock:
+            self._buffer.append(record)
+            if len(self._buffer) < self.flush_every:
+                return
+            records, self._buffer = self._buffer, []
+        self._write(records)
+
+    def flush(self):
+        with self._lock:
+            records, self._buffer = self._buffer, []
+        self._write(records)
+
+    def _write(self, records: List[Dict]):
+        if not records:
+            return
+        lines = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+_enabled = os.environ.get("PROPOSAL_PERF", "") not in ("", "0")
+_track_memory = os.environ.get("PROPOSAL_PERF_MEMORY", "1") != "0"
+_sink = JsonlSink()
+_recent: deque = deque(maxlen=500)
+_local = threading.local()
+_started_tracing = False
+# 구간이 열려 있는 스레드 수 / 두 스레드 이상이 겹친 횟수 (메모리 측정 신뢰성 판단)
+_active_lock = threading.Lock()
+_active_threads = 0
+_overlaps = 0
+_run_id: "contextvars.ContextVar[Optional[str]]" = contextvars.ContextVar("perf_run_id", default=None)
+atexit.register(lambda: _sink.flush())
+
+
+def enable(path: Optional[str] = None, track_memory: bool = True):
+    global _enabled, _track_memory
+    if path:
+        _sink.flush()
+        _sink.path = path
+    _enabled = True
+    _track_memory = track_memory
+
+
+def disable():
+    global _enabled, _started_tracing
+    _enabled = False
+    _sink.flush()
+    # 계측을 위해 켰던 tracemalloc 은 함께 종료 (꺼진 상태의 오버헤드 제거)
+    if _started_tracing and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _started_tracing = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def flush():
+    _sink.flush()
+
+
+def recent_records(since: float = 0.0, run_id: Optional[str] = None) -> List[Dict]:
+    return [r for r in list(_recent) if r["ts"] >= since and (run_id is None or r.get("run_id") == run_id)]
+
+
+def stage_totals(run_id: str) -> Dict[str, float]:
+    """실행 하나의 단계별 벽시계 시간 합 (같은 단계가 여러 번 기록되면 더함)"""
+    totals: Dict[str, float] = {}
+    for r in recent_records(run_id=run_id):
+        if "wall_s" in r:
+            totals[r["stage"]] = round(totals.get(r["stage"], 0.0) + r["wall_s"], 6)
+    return totals
+
+
+# ------------------------------------------------------------
+# 🏷️ 실행 id (Streamlit 스크립트 실행 1회, CLI 작업 1건 등)
+# ------------------------------------------------------------
+def start_run(run_id: Optional[str] = None) -> str:
+    run_id = run_id or uuid.uuid4().hex[:12]
+    _run_id.set(run_id)
+    return run_id
+
+
+def current_run() -> Optional[str]:
+    return _run_id.get()
+
+
+def bind_run(fn):
+    """지금의 실행 id 를 다른 스레드에서 실행될 fn 에 전달 (스레드 풀 작업은 컨텍스트를 물려받지 않음)"""
+    run_id = _run_id.get()
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _run_id.set(run_id)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _run_id.reset(token)
+
+    return wrapper
+
+
+def _tag(entry: Dict):
+    run_id = _run_id.get()
+    if run_id is not None:
+        entry["run_id"] = run_id
+
+
+# ------------------------------------------------------------
+# 🔕 꺼져 있을 때의 공용 객체
+# ------------------------------------------------------------
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **fields):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+# ------------------------------------------------------------
+# 📏 계측 구간
+# ------------------------------------------------------------
+class _Stage:
+    def __init__(self, name: str, fields: Dict):
+        self.name = name
+        self.fields = fields
+        self.peak = 0
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def __enter__(self):
+        global _started_tracing, _active_threads, _overlaps
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        with _active_lock:
+            if not stack:
+                if _active_threads:
+                    _overlaps += 1
+                _active_threads += 1
+            self.exclusive = _active_threads == 1
+            self.overlaps = _overlaps
+        self.track_memory = _track_memory
+        if self.track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _started_tracing = True
+            current, peak = tracemalloc.get_traced_memory()
+            # 부모 구간의 최대치를 보존한 뒤 이 구간 기준으로 초기화
+            # (다른 스레드의 구간이 열려 있으면 그 구간의 최대치를 지우지 않도록 초기화하지 않음)
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak)
+            if self.exclusive:
+                tracemalloc.reset_peak()
+            self.mem_start = current
+        stack.append(self)
+        self.ts = time.time()
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _active_threads
+        wall = time.perf_counter() - self.wall_start
+        cpu = time.process_time() - self.cpu_start
+        stack = _local.stack
+        stack.pop()
+        with _active_lock:
+            exclusive = self.exclusive and _overlaps == self.overlaps
+            if not stack:
+                _active_threads -= 1
+
+        entry = {"stage": self.name, "ts": round(self.ts, 3),
+                 "wall_s": round(wall, 6), "cpu_s": round(cpu, 6)}
+        if self.track_memory and tracemalloc.is_tracing():
+            _, peak = tracemalloc.get_traced_memory()
+            self.peak = max(self.peak, peak)
+            if exclusive:
+                entry["peak_mem_bytes"] = max(0, self.peak - self.mem_start)
+            else:
+                entry["mem_concurrent"] = True
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, self.peak)
+        if exc_type is not None:
+            entry["error"] = exc_type.__name__
+        entry.update(self.fields)
+        _tag(entry)
+
+        _recent.append(entry)
+        _sink.write(entry)
+        return False
+
+
+def record(name: str, **fields):
+    """이미 측정한 값(예: 스트리밍 첫 토큰 시간)을 바로 기록"""
+    if not _enabled:
+        return
+    entry = {"stage": name, "ts": round(time.time(), 3)}
+    entry.update(fields)
+    _tag(entry)
+    _recent.append(entry)
+    _sink.write(entry)
+
+
+def stage(name: str, **fields):
+    if not _enabled:
+        return _NULL_STAGE
+    return _Stage(name, fields)
+
+
+def instrumented(name: Optional[str] = None):
+    def decorator(fn):
+        stage_name = name or f"{fn.__module__}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Stage(stage_name, {}):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,177 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import List, Dict, Optional, Callable
+from instrumentation import stage
+
+# ================================================================
+# 🗄️ LLM 응답 캐시 (SQLite)
+# - 키: 모델 + 메시지 + temperature + top_p + max_tokens 의 SHA-256
+# - TTL 만료 + 최대 항목 수 초과 시 오래 사용되지 않은 항목부터 삭제
+# - client 는 chat.completions.create(...) 만 있으면 되므로 가짜 클라이언트로 검증 가능
+# ================================================================
+
+CACHE_PATH = os.path.join(".cache", "llm_cache.sqlite")
+
+
+def make_cache_key(model: str, messages: List[Dict[str, str]], temperature: Optional[float] = None,
+                   top_p: Optional[float] = None, max_tokens: Optional[int] = None) -> str:
+    payload = json.dumps(
+        {"model": model, "messages": messages, "temperature": temperature,
+         "top_p": top_p, "max_tokens": max_tokens},
+        ensure_ascii=False, sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, path: str = CACHE_PATH, ttl_seconds: float = 7 * 24 * 3600, max_entries: int = 5000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, model TEXT, content TEXT, created REAL, accessed REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed)")
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT content, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, model: str, content: str):
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, content, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, model, content, now, now)
+            )
+            self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+        count = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count > self.max_entries:
+            conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def clear(self):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "적중": self.hits,
+                "미적중": self.misses,
+                "적중률": round(self.hits / total, 2) if total else 0.0,
+            }
+
+
+_llm_cache = LLMCache()
+
+
+def get_llm_cache() -> LLMCache:
+    return _llm_cache
+
+
+# ------------------------------------------------------------
+# 🤖 캐시를 거치는 chat completion 호출
+# ------------------------------------------------------------
+def cached_completion(client, model: str, messages: List[Dict[str, str]], temperature: Optional[float] = None,
+                      top_p: Optional[float] = None, max_tokens: Optional[int] = None,
+                      cache: Optional[LLMCache] = None, bypass: bool = False,
+                      log: Optional[Callable[[str], None]] = None) -> str:
+    """
+    bypass=True 이면 캐시를 읽지 않고 새로 호출한 뒤 결과로 캐시를 갱신
+    """
+    cache = cache or _llm_cache
+    key = make_cache_key(model, messages, temperature, top_p, max_tokens)
+
+    with stage("llm.completion", model=model) as s:
+        if not bypass:
+            content = cache.get(key)
+            if content is not None:
+                s.set(cache="hit")
+                if log:
+                    log(f"LLM 캐시 적중 ({model}) | {cache.stats()}")
+                return content
+
+        params = {"temperature": temperature, "top_p": top_p, "max_tokens": max_tokens}
+        response = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            **{name: value for name, value in params.items() if value is not None}
+        )
+        content = response.choices[0].message.content.strip()
+        cache.put(key, model, content)
+        s.set(cache="bypass" if bypass else "miss")
+    if log:
+        log(f"LLM 캐시 {'우회' if bypass else '미적중'} ({model}) | {cache.stats()}")
+    return content
+
+
+# ------------------------------------------------------------
+# ▶️ 로컬 가짜 클라이언트로 동작 확인 (직접 실행 시)
+# ------------------------------------------------------------
+if __name__ == "__main__":
+    import tempfile
+    from types import SimpleNamespace
+
+    class FakeClient:
+        def __init__(self):
+            self.calls = 0
+            self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+        def create(self, **kwargs):
+            self.calls += 1
+            text = f"응답 #{self.calls}: {kwargs['messages'][-1]['content']}"
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+    fake = FakeClient()
+    cache = LLMCache(path=os.path.join(tempfile.mkdtemp(), "llm.sqlite"), max_entries=2)
+    messages = [{"role": "user", "content": "[3.1 보안] → 누락됨"}]
+
+    first = cached_completion(fake, "fake-model", messages, temperature=0.65, cache=cache, log=print)
+    second = cached_completion(fake, "fake-model", messages, temperature=0.65, cache=cache, log=print)
+    assert first == second and fake.calls == 1
+
+    cached_completion(fake, "fake-model", messages, temperature=0.65, cache=cache, bypass=True, log=print)
+    assert fake.calls == 2
+
+    for i in range(3):
+        cached_completion(fake, "fake-model", [{"role": "user", "content": f"항목 {i}"}], cache=cache)
+    count = cache._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+    assert count == 2
+    print("✅ LLM 캐시 확인 완료:", cache.stats())
@@ -0,0 +1,56 @@
+import os
+import threading
+import weakref
+from typing import Optional
+
+# ================================================================
+# 🔌 Groq 클라이언트 공용 팩토리
+# - groq / httpx 는 처음 호출할 때 import (앱 첫 화면 렌더링에 비용 없음)
+# - 같은 API 키의 동기 클라이언트는 프로세스 안에서 하나만 만들어 연결 풀을 공유
+# - 비동기 클라이언트는 이벤트 루프마다 하나 (루프가 닫히면 함께 정리)
+# - API 키: 인자 → 환경 변수 GROQ_API_KEY → Streamlit secrets(groq_api_key / GROQ_API_KEY)
+# ================================================================
+
+_lock = threading.Lock()
+_clients = {}
+_async_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def resolve_api_key(api_key: Optional[str] = None) -> str:
+    if api_key:
+        return api_key
+    if os.environ.get("GROQ_API_KEY"):
+        return os.environ["GROQ_API_KEY"]
+    try:
+        import streamlit as st
+        for name in ("groq_api_key", "GROQ_API_KEY"):
+            if name in st.secrets:
+                return st.secrets[name]
+    except Exception:
+        pass
+    return ""
+
+
+def get_client(api_key: Optional[str] = None):
+    key = resolve_api_key(api_key)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            from groq import Groq
+            client = _clients[key] = Groq(api_key=key)
+        return client
+
+
+def get_async_client(api_key: Optional[str] = None, max_retries: int = 0):
+    """실행 중인 이벤트 루프 안에서 호출"""
+    import asyncio
+
+    key = resolve_api_key(api_key)
+    loop = asyncio.get_running_loop()
+    with _lock:
+        per_loop = _async_clients.setdefault(loop, {})
+        client = per_loop.get((key, max_retries))
+        if client is None:
+            from groq import AsyncGroq
+            client = per_loop[(key, max_retries)] = AsyncGroq(api_key=key, max_retries=max_retries)
+        return client
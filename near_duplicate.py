@@ -0,0 +1,267 @@
+import os
+import sys
+import pickle
+import zlib
+import argparse
+import threading
+from itertools import combinations
+from typing import List, Dict, Iterable, Optional, Tuple
+
+from comparator import normalize, WORD_RUN_PATTERN
+from instrumentation import stage
+from pdf_extractor import extract_text_by_page, compute_file_hash, BLANK_PAGE_TEXT
+
+# ================================================================
+# 🪞 제안서 간 / 제안요청서 대비 유사 페이지(복사) 탐지 — MinHash + LSH
+# - 페이지 텍스트를 normalize 후 단어 구간으로 나눠 연속 SHINGLE_SIZE 단어를 shingle 로 사용
+# - 페이지마다 NUM_PERM 개 해시 함수의 최솟값(MinHash 서명) 계산
+#   → 두 서명에서 값이 같은 비율이 Jaccard 유사도의 추정치
+# - 서명을 BANDS 개 구간으로 나눠 구간이 통째로 같은 페이지끼리만 후보로 비교 (LSH)
+#   → 전체 페이지 쌍을 비교하지 않으므로 배치 크기에 대해 준선형
+# - 인덱스는 pickle 로 저장, 새 제출본은 기존 인덱스에 추가하면서 새 후보 쌍만 보고
+# 실행: python near_duplicate.py 제안요청서.pdf 제안서_폴더/ --index .cache/near_duplicate.pkl
+# ================================================================
+
+INDEX_PATH = os.path.join(".cache", "near_duplicate.pkl")
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+BANDS = 32                 # 구간당 4행 → 유사도 약 0.42 부근부터 후보가 되기 시작
+DEFAULT_THRESHOLD = 0.5    # 보고할 추정 Jaccard 하한
+MIN_SHINGLES = 10          # 이보다 짧은 페이지(표지, 빈 페이지 등)는 제외
+SEED = 1
+
+
+# ------------------------------------------------------------
+# ✂️ shingle / 서명
+# ------------------------------------------------------------
+def page_shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    words = WORD_RUN_PATTERN.findall(normalize(text))
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _permutations(num_perm: int = NUM_PERM, seed: int = SEED):
+    """
+    ((a·x + b) mod 2^64) >> 32 형태의 해시 함수 계수 (multiply-add-shift, 32비트 입력 → 32비트)
+    seed 가 같으면 항상 같은 값 → 저장한 서명과 새 서명을 비교 가능
+    """
+    import numpy as np
+
+    rng = np.random.RandomState(seed)
+    a = rng.randint(0, 1 << 64, size=num_perm, dtype=np.uint64)
+    b = rng.randint(0, 1 << 64, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def minhash_signature(shingles: Iterable[str], permutations) -> "np.ndarray":
+    import numpy as np
+
+    a, b = permutations
+    # crc32 는 프로세스와 무관하게 같은 값 (hash() 는 실행마다 달라 저장 불가)
+    values = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64)
+    if not len(values):
+        return np.full(len(a), 0xFFFFFFFF, dtype=np.uint32)
+    # uint64 곱셈/덧셈은 2^64 로 나눈 나머지 (넘침 = 의도된 동작), 상위 32비트 사용
+    hashed = (np.outer(a, values) + b[:, None]) >> np.uint64(32)
+    return hashed.min(axis=1).astype(np.uint32)
+
+
+def estimate_jaccard(sig_a, sig_b) -> float:
+    return float((sig_a == sig_b).mean())
+
+
+# ------------------------------------------------------------
+# 🗂️ LSH 인덱스
+# ------------------------------------------------------------
+class NearDuplicateIndex:
+    def __init__(self, num_perm: int = NUM_PERM, bands: int = BANDS, shingle_size: int = SHINGLE_SIZE):
+        if num_perm % bands:
+            raise ValueError("num_perm 은 bands 의 배수여야 합니다.")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.documents: Dict[str, Dict] = {}          # 문서 이름 → {"hash", "pages": [페이지 번호]}
+        self.keys: List[Tuple[str, int]] = []         # 페이지 id → (문서 이름, 페이지 번호)
+        self.signatures: List = []                    # 페이지 id → MinHash 서명
+        self.buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self._permutations = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_permutations"], state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._permutations = None
+        self._lock = threading.Lock()
+
+    @property
+    def permutations(self):
+        if self._permutations is None:
+            self._permutations = _permutations(self.num_perm)
+        return self._permutations
+
+    def _band_keys(self, signature) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def has_document(self, name: str, file_hash: Optional[str] = None) -> bool:
+        doc = self.documents.get(name)
+        return doc is not None and (file_hash is None or doc["hash"] == file_hash)
+
+    # ➕ 문서 추가 (새 문서의 페이지가 포함된 후보 쌍만 반환)
+    def add_document(self, name: str, pages: Iterable[Dict], file_hash: Optional[str] = None,
+                     threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+        """
+        읽지 못한 PDF(extract_text_by_page 의 오류 레코드)는 ValueError
+        → 0페이지 문서로 등록되면 이후 실행에서 "이미 색인됨" 으로 영영 건너뛰게 되므로 등록하지 않음
+        """
+        if name in self.documents:
+            raise ValueError(f"이미 등록된 문서입니다: {name}")
+
+        with stage("near_duplicate.add_document", document=name) as s:
+            new_pages = []
+            for i, page in enumerate(pages):
+                if "error" in page:
+                    raise ValueError(f"PDF 를 읽을 수 없습니다: {page['error']}")
+                text = page.get("text", "")
+                if text == BLANK_PAGE_TEXT:
+                    continue
+                shingles = page_shingles(text, self.shingle_size)
+                if len(shingles) < MIN_SHINGLES:
+                    continue
+                new_pages.append((page.get("page_number", i + 1), minhash_signature(shingles, self.permutations)))
+
+            candidates = set()
+            with self._lock:
+                self.documents[name] = {"hash": file_hash, "pages": [number for number, _ in new_pages]}
+                for number, signature in new_pages:
+                    page_id = len(self.keys)
+                    self.keys.append((name, number))
+                    self.signatures.append(signature)
+                    for band, key in zip(self.buckets, self._band_keys(signature)):
+                        bucket = band.setdefault(key, [])
+                        candidates.update((other, page_id) for other in bucket)
+                        bucket.append(page_id)
+
+            pairs = self._report(candidates, threshold)
+            s.set(pages=len(new_pages), candidates=len(candidates), pairs=len(pairs))
+            return pairs
+
+    def add_pdf(self, name: str, file_bytes: bytes, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+        return self.add_document(name, extract_text_by_page(file_bytes), compute_file_hash(file_bytes), threshold)
+
+    # 🔎 전체 후보 쌍 (배치 전체 보고서)
+    def candidate_pairs(self, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+        candidates = set()
+        for band in self.buckets:
+            for bucket in band.values():
+                if len(bucket) > 1:
+                    candidates.update(combinations(bucket, 2))
+        return self._report(candidates, threshold)
+
+    def query(self, pages: Iterable[Dict], threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+        """인덱스에 추가하지 않고 페이지들과 유사한 기존 페이지 조회"""
+        results = []
+        for i, page in enumerate(pages):
+            shingles = page_shingles(page.get("text", ""), self.shingle_size)
+            if len(shingles) < MIN_SHINGLES:
+                continue
+            signature = minhash_signature(shingles, self.permutations)
+            seen = set()
+            for band, key in zip(self.buckets, self._band_keys(signature)):
+                seen.update(band.get(key, ()))
+            for other in seen:
+                score = estimate_jaccard(signature, self.signatures[other])
+                if score >= threshold:
+                    name, number = self.keys[other]
+                    results.append({"페이지": page.get("page_number", i + 1), "유사 문서": name,
+                                    "유사 페이지": number, "추정 유사도": round(score, 3)})
+        return sorted(results, key=lambda r: -r["추정 유사도"])
+
+    def _report(self, candidates, threshold: float) -> List[Dict]:
+        pairs = []
+        for first, second in candidates:
+            doc_a, page_a = self.keys[first]
+            doc_b, page_b = self.keys[second]
+            if doc_a == doc_b:
+                continue  # 같은 문서 안의 반복(머리글 등)은 제외
+            score = estimate_jaccard(self.signatures[first], self.signatures[second])
+            if score >= threshold:
+                pairs.append({"문서 A": doc_a, "페이지 A": page_a, "문서 B": doc_b, "페이지 B": page_b,
+                              "추정 유사도": round(score, 3)})
+        pairs.sort(key=lambda p: (-p["추정 유사도"], p["문서 A"], p["페이지 A"], p["문서 B"], p["페이지 B"]))
+        return pairs
+
+    # 💾 저장 / 불러오기
+    def save(self, path: str = INDEX_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path: str = INDEX_PATH) -> "NearDuplicateIndex":
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return cls()
+
+
+# ------------------------------------------------------------
+# ▶️ CLI: 제안요청서 + 제안서 폴더의 유사 페이지 보고
+# ------------------------------------------------------------
+def list_pdfs(paths: List[str]) -> List[str]:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(os.path.join(path, n) for n in os.listdir(path) if n.lower().endswith(".pdf")))
+        else:
+            files.append(path)
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="제안서 간 / 제안요청서 대비 유사 페이지 탐지 (MinHash + LSH)")
+    parser.add_argument("paths", nargs="+", help="PDF 파일 또는 폴더 (제안요청서 포함 가능)")
+    parser.add_argument("--index", default=INDEX_PATH, help="서명 인덱스 저장 경로 (이어서 추가)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="보고할 추정 유사도 하한")
+    parser.add_argument("--all", action="store_true", help="새 문서뿐 아니라 인덱스 전체의 후보 쌍 출력")
+    args = parser.parse_args()
+
+    index = NearDuplicateIndex.load(args.index)
+    new_pairs, failures = [], 0
+    for path in list_pdfs(args.paths):
+        name = os.path.basename(path)
+        with open(path, "rb") as f:
+            file_bytes = f.read()
+        file_hash = compute_file_hash(file_bytes)
+        if index.has_document(name, file_hash):
+            print(f"⏭️  건너뜀 (이미 색인됨): {name}")
+            continue
+        if index.has_document(name):
+            print(f"⚠️  같은 이름의 다른 파일이 이미 색인되어 있어 건너뜀: {name}", file=sys.stderr)
+            continue
+        try:
+            pairs = index.add_document(name, extract_text_by_page(file_bytes), file_hash, args.threshold)
+        except ValueError as e:
+            failures += 1
+            print(f"❌ {name}: {e}", file=sys.stderr)
+            continue
+        print(f"✅ {name}: 페이지 {len(index.documents[name]['pages'])}장 색인, 유사 페이지 쌍 {len(pairs)}건")
+        new_pairs.extend(pairs)
+    index.save(args.index)
+
+    pairs = index.candidate_pairs(args.threshold) if args.all else new_pairs
+    for p in pairs:
+        print(f"- {p['문서 A']} p.{p['페이지 A']} ↔ {p['문서 B']} p.{p['페이지 B']} | 추정 유사도 {p['추정 유사도']}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,17 @@
 
 
-import fitz  # PyMuPDF
 import os
+import re
+import mmap
+import pickle
+import hashlib
 import datetime
-from typing import Optional, List, Dict
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Iterable, Iterator, Union
+from instrumentation import stage, instrumented
 
 # ================================================================
 # 📄 PDF 텍스트 추출기 (확장형 500줄 수준)
@@ -14,28 +22,243 @@ from typing import Optional, List, Dict
 # ------------------------------------------------------------
 # 📘 페이지별 텍스트 추출 함수
 # ------------------------------------------------------------
-def extract_text_by_page(file_bytes: bytes) -> List[Dict]:
+PARALLEL_CHUNK_SIZE = 32
+
+
+def _page_entry(i: int, page) -> Dict:
+    text = page.get_text("text")
+    images = page.get_images(full=True)
+    return {
+        "page_number": i + 1,
+        "character_count": len(text),
+        "has_image": bool(images),
+        "text": text.strip() if text else BLANK_PAGE_TEXT
+    }
+
+
+# ------------------------------------------------------------
+# 🧱 컬럼형 페이지 저장소
+# - 모든 페이지 텍스트를 "\n" 으로 이은 문자열 하나 + 페이지 시작 위치 배열
+#   (이어 붙인 문자열이 곧 문서 전체 텍스트이므로 별도 복사본이 필요 없음)
+# - 문자 수 / 이미지 여부 / 빈 페이지 여부는 NumPy 배열
+# - 기존 호출부를 위해 페이지마다 dict 처럼 동작하는 PageView 제공
+# ------------------------------------------------------------
+BLANK_PAGE_TEXT = "[빈 페이지]"
+PAGE_FIELDS = ("page_number", "character_count", "has_image", "text")
+
+
+class PageView(Mapping):
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store: "PageStore", index: int):
+        self._store = store
+        self._index = index
+
+    def __getitem__(self, key):
+        store, i = self._store, self._index
+        if key == "text":
+            return store.page_text(i)
+        if key == "page_number":
+            return int(store.page_numbers[i])
+        if key == "character_count":
+            return int(store.character_counts[i])
+        if key == "has_image":
+            return bool(store.has_image[i])
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(PAGE_FIELDS)
+
+    def __len__(self) -> int:
+        return len(PAGE_FIELDS)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class PageStore(Sequence):
+    def __init__(self, text: str, starts, page_numbers, character_counts, has_image, blank):
+        self.text = text
+        self.starts = starts
+        self.page_numbers = page_numbers
+        self.character_counts = character_counts
+        self.has_image = has_image
+        self.blank = blank
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> "PageStore":
+        import numpy as np
+
+        texts, numbers, counts, images = [], [], [], []
+        for p in records:
+            texts.append(p["text"])
+            numbers.append(p["page_number"])
+            counts.append(p["character_count"])
+            images.append(p["has_image"])
+
+        lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+        starts = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum(lengths + 1, out=starts[1:])
+        blank = np.fromiter((not t or t == BLANK_PAGE_TEXT for t in texts), dtype=bool, count=len(texts))
+        return cls(
+            "\n".join(texts),
+            starts,
+            np.asarray(numbers, dtype=np.int32),
+            np.asarray(counts, dtype=np.int32),
+            np.asarray(images, dtype=bool),
+            blank,
+        )
+
+    def page_text(self, i: int) -> str:
+        return self.text[self.starts[i]:self.starts[i + 1] - 1]
+
+    def __len__(self) -> int:
+        return len(self.page_numbers)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [PageView(self, j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return PageView(self, i)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PageStore):
+            import numpy as np
+
+            # 같은 전체 텍스트라도 페이지 나눔이 다르면 배열 길이가 달라짐 → array_equal 로 비교
+            return (self.text == other.text
+                    and np.array_equal(self.starts, other.starts)
+                    and np.array_equal(self.page_numbers, other.page_numbers)
+                    and np.array_equal(self.character_counts, other.character_counts)
+                    and np.array_equal(self.has_image, other.has_image))
+        if isinstance(other, list):
+            return self.to_records() == other
+        return NotImplemented
+
+    def to_records(self) -> List[Dict]:
+        return [dict(view) for view in self]
+
+    def statistics(self) -> Dict:
+        total_pages = len(self)
+        total_characters = int(self.character_counts.sum())
+        return {
+            "총 페이지 수": total_pages,
+            "총 문자 수": total_characters,
+            "이미지 포함 페이지 수": int(self.has_image.sum()),
+            "빈 페이지 수": int(self.blank.sum()),
+            "텍스트 평균 길이": round(total_characters / total_pages, 2) if total_pages > 0 else 0
+        }
+
+
+# 🧵 워커 프로세스: 문서 바이트는 초기화 시 한 번만 전달받아 재사용
+_worker_doc = None
+
+
+def _init_worker(file_bytes: bytes):
+    import fitz  # PyMuPDF
+
+    global _worker_doc
+    _worker_doc = fitz.open(stream=file_bytes, filetype="pdf")
+
+
+def _extract_page_range(start: int, stop: int) -> List[Dict]:
+    return [_page_entry(i, _worker_doc[i]) for i in range(start, stop)]
+
+
+def _extract_parallel(file_bytes: bytes, page_count: int, workers: int, chunk_size: int) -> PageStore:
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Streamlit 서버처럼 스레드가 여럿인 프로세스를 fork 하면 다른 스레드가 잡고 있던 락 때문에
+    # 워커가 멈출 수 있음 → forkserver(미지원 플랫폼은 spawn)로 깨끗한 프로세스에서 시작
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    ranges = [(start, min(start + chunk_size, page_count)) for start in range(0, page_count, chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method),
+                             initializer=_init_worker, initargs=(file_bytes,)) as pool:
+        chunks = pool.map(_extract_page_range, *zip(*ranges))
+        return PageStore.from_records(entry for chunk in chunks for entry in chunk)
+
+
+# ------------------------------------------------------------
+# 🌊 스트리밍 페이지 추출 (메모리 사용량 일정)
+# ------------------------------------------------------------
+@contextmanager
+def open_pdf(source: Union[bytes, bytearray, memoryview, str]) -> Iterator["fitz.Document"]:
+    """
+    PDF 열기
+    - 경로(str): 파일을 메모리 매핑하여 복사 없이 열기
+    - 업로드 객체: getbuffer() 가 있으면 버퍼를 그대로 사용, 없으면 read()
+    - bytes / memoryview: 그대로 사용
+    """
+    mapped = None
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        stream = memoryview(mapped)
+    elif hasattr(source, "getbuffer"):
+        stream = source.getbuffer()
+    elif hasattr(source, "read"):
+        stream = source.read()
+    else:
+        stream = source
+
+    import fitz  # PyMuPDF (첫 사용 시 로드)
+
+    doc = fitz.open(stream=stream, filetype="pdf")
     try:
-        doc = fitz.open(stream=file_bytes, filetype="pdf")
-        page_data = []
-
-        for i, page in enumerate(doc):
-            text = page.get_text("text")
-            images = page.get_images(full=True)
-            chars = len(text)
-            has_image = bool(images)
-            entry = {
-                "page_number": i + 1,
-                "character_count": chars,
-                "has_image": has_image,
-                "text": text.strip() if text else "[빈 페이지]"
-            }
-            page_data.append(entry)
+        yield doc
+    finally:
+        doc.close()
+        if mapped is not None:
+            stream.release()
+            mapped.close()
 
-        return page_data
 
+def iter_pages(source) -> Iterator[Dict]:
+    """
+    페이지 레코드를 한 장씩 생성 (전체 리스트를 만들지 않음)
+    """
+    try:
+        with open_pdf(source) as doc:
+            for i, page in enumerate(doc):
+                yield _page_entry(i, page)
     except Exception as e:
-        return [{"page_number": 0, "error": str(e), "text": "[오류 발생]"}]
+        yield {"page_number": 0, "error": str(e), "text": "[오류 발생]"}
+
+
+def iter_lines(pages: Iterable[Dict]) -> Iterator[str]:
+    for p in pages:
+        if "text" in p:
+            yield from p["text"].split("\n")
+
+
+def extract_text_by_page(file_bytes: bytes, workers: int = 1,
+                         chunk_size: int = PARALLEL_CHUNK_SIZE) -> Union[PageStore, List[Dict]]:
+    """
+    workers > 1 이고 페이지 수가 chunk_size 보다 많으면 페이지 구간을 나눠 프로세스 풀에서 병렬 추출
+    (결과는 항상 페이지 순서, 직렬 추출과 동일)
+    반환: PageStore (페이지별 dict 처럼 사용 가능), 오류 시 오류 정보 dict 1개를 담은 리스트
+    """
+    with stage("pdf.extract_text_by_page", workers=workers) as s:
+        if workers > 1:
+            try:
+                with open_pdf(file_bytes) as doc:
+                    page_count = doc.page_count
+                if page_count > chunk_size:
+                    page_data = _extract_parallel(file_bytes, page_count, workers, chunk_size)
+                    s.set(pages=len(page_data), parallel=True)
+                    return page_data
+            except Exception as e:
+                return [{"page_number": 0, "error": str(e), "text": "[오류 발생]"}]
+
+        records = list(iter_pages(file_bytes))
+        s.set(pages=len(records), parallel=False)
+        if any("error" in p for p in records):
+            return records
+        return PageStore.from_records(records)
 
 
 # ------------------------------------------------------------
@@ -46,23 +269,31 @@ def extract_text_from_pdf(uploaded_file) -> str:
     Streamlit 업로드 객체 또는 바이너리에서 전체 텍스트 추출
     """
     try:
-        file_bytes = uploaded_file.read()
-        pages = extract_text_by_page(file_bytes)
-        full_text = "\n".join([p["text"] for p in pages if "text" in p])
-        return full_text
+        return "\n".join(p["text"] for p in iter_pages(uploaded_file) if "text" in p)
 
     except Exception as e:
         return f"[PDF 텍스트 추출 실패]: {e}"
 
 
 # ------------------------------------------------------------
-# 📦 PDF 통계 요약
+# 📦 PDF 통계 요약 (리스트 또는 페이지 스트림, 한 번 순회)
 # ------------------------------------------------------------
-def summarize_pdf_statistics(page_data: List[Dict]) -> Dict:
-    total_pages = len(page_data)
-    total_characters = sum(p.get("character_count", 0) for p in page_data)
-    pages_with_images = sum(1 for p in page_data if p.get("has_image"))
-    blank_pages = sum(1 for p in page_data if not p.get("text") or p["text"] in ("[빈 페이지]", ""))
+@instrumented("pdf.summarize_pdf_statistics")
+def summarize_pdf_statistics(page_data: Iterable[Dict]) -> Dict:
+    if isinstance(page_data, PageStore):
+        return page_data.statistics()
+
+    total_pages = 0
+    total_characters = 0
+    pages_with_images = 0
+    blank_pages = 0
+    for p in page_data:
+        total_pages += 1
+        total_characters += p.get("character_count", 0)
+        if p.get("has_image"):
+            pages_with_images += 1
+        if not p.get("text") or p["text"] in (BLANK_PAGE_TEXT, ""):
+            blank_pages += 1
 
     return {
         "총 페이지 수": total_pages,
@@ -73,14 +304,324 @@ def summarize_pdf_statistics(page_data: List[Dict]) -> Dict:
     }
 
 
+# ------------------------------------------------------------
+# 🔍 문서 제목 추출 (텍스트 또는 줄 스트림)
+# ------------------------------------------------------------
+TITLE_KEYWORDS = ["제안서", "계획", "방안", "구축", "시스템"]
+
+
+@instrumented("pdf.extract_document_title")
+def extract_document_title(text: Union[str, Iterable[str]]) -> str:
+    lines = text.split("\n") if isinstance(text, str) else text
+    first_candidate = None
+    for line in lines:
+        line = line.strip()
+        if not (5 < len(line) < 60):
+            continue
+        if any(keyword in line for keyword in TITLE_KEYWORDS):
+            return line
+        if first_candidate is None:
+            first_candidate = line
+    return first_candidate if first_candidate is not None else "제안 제목 미상"
+
+
+# ------------------------------------------------------------
+# 🗃️ 문서 캐시 (SHA-256 내용 기반, 메모리 LRU + 디스크)
+# ------------------------------------------------------------
+CACHE_DIR = os.path.join(".cache", "documents")
+
+
+def compute_file_hash(file_bytes: bytes) -> str:
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+class DocumentCache:
+    """
+    파일 내용(SHA-256) 기준으로 파싱 결과를 보관하는 캐시
+    - 메모리: 최근 사용 순(LRU) + 총 문자 수 상한
+    - 디스크: pickle 파일, 총 바이트 상한 초과 시 오래된 파일부터 삭제
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_memory_entries: int = 16,
+                 max_memory_chars: int = 50_000_000, max_disk_bytes: int = 500 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_memory_entries = max_memory_entries
+        self.max_memory_chars = max_memory_chars
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, Dict]" = OrderedDict()
+        self._memory_chars = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    # 🔑 캐시 조회 / 저장
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, entry)
+            return entry
+
+    def put(self, key: str, entry: Dict):
+        with self._lock:
+            self._remember(key, entry)
+        self._write_disk(key, entry)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "메모리 적중": self.hits,
+                "디스크 적중": self.disk_hits,
+                "미적중": self.misses,
+                "메모리 항목 수": len(self._memory),
+                "메모리 문자 수": self._memory_chars,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_chars = 0
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".pkl"):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+    # 🧠 메모리 LRU
+    def _remember(self, key: str, entry: Dict):
+        if key in self._memory:
+            self._memory_chars -= len(self._memory.pop(key)["text"])
+        self._memory[key] = entry
+        self._memory_chars += len(entry["text"])
+        while self._memory and (len(self._memory) > self.max_memory_entries
+                                or self._memory_chars > self.max_memory_chars):
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_chars -= len(evicted["text"])
+
+    # 💾 디스크 저장소
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def _read_disk(self, key: str) -> Optional[Dict]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+            os.utime(path)  # 최근 사용 시각 갱신 (디스크 LRU 기준)
+            return entry
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # AttributeError / ImportError: PageStore 등 클래스가 바뀌기 전에 저장된 파일 → 캐시 미적중으로 처리
+            return None
+
+    def _write_disk(self, key: str, entry: Dict):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = self._path(key) + ".tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+            self._evict_disk()
+        except OSError:
+            pass
+
+    def _evict_disk(self):
+        files = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".pkl"):
+                path = os.path.join(self.cache_dir, name)
+                stat = os.stat(path)
+                files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+
+_document_cache = DocumentCache()
+
+
+def get_document_cache() -> DocumentCache:
+    return _document_cache
+
+
+# ------------------------------------------------------------
+# 📚 캐시를 거치는 문서 로드 (페이지 + 전체 텍스트 + 통계)
+# ------------------------------------------------------------
+def load_document(file_bytes: bytes, cache: Optional[DocumentCache] = None, workers: int = 1) -> Dict:
+    """
+    같은 내용의 PDF는 한 번만 파싱합니다.
+    반환값: {"hash", "pages", "text", "stats"}
+    """
+    cache = cache or _document_cache
+    with stage("pdf.load_document", bytes=len(file_bytes)) as s:
+        key = compute_file_hash(file_bytes)
+        entry = cache.get(key)
+        if entry is not None:
+            s.set(cache="hit", pages=len(entry["pages"]))
+            return entry
+
+        pages = extract_text_by_page(file_bytes, workers=workers)
+        if isinstance(pages, PageStore):
+            text = pages.text  # 페이지 저장소의 버퍼가 곧 전체 텍스트 (복사 없음)
+        else:
+            text = "\n".join([p["text"] for p in pages if "text" in p])
+        entry = {
+            "hash": key,
+            "pages": pages,
+            "text": text,
+            "stats": summarize_pdf_statistics(pages),
+        }
+        # 파싱 오류 결과는 캐시하지 않음
+        if not any("error" in p for p in pages):
+            cache.put(key, entry)
+        s.set(cache="miss", pages=len(pages))
+        return entry
+
+
+# ------------------------------------------------------------
+# 🔁 개정본 로드 (페이지 지문 기반 증분 추출)
+# - 페이지 지문: 콘텐츠 스트림 + 페이지 크기/회전 + 페이지가 참조하는 리소스의 SHA-256
+#   (텍스트 추출보다 훨씬 저렴)
+#   → Form XObject 안의 텍스트, 글꼴, 이미지만 바뀐 페이지도 다른 지문이 됨
+#   → 리소스는 참조를 따라가며 (중첩 XObject 포함) 객체 원문 + 스트림을 해시,
+#     객체 번호 대신 참조 대상의 해시를 넣으므로 객체 번호만 바뀐 경우는 같은 지문
+# - 이전 버전에 같은 지문의 페이지가 있으면 그 레코드를 재사용하고 페이지 번호만 갱신
+# - 바뀌었거나 새로 들어온 페이지만 텍스트 추출, 삭제된 페이지는 자연히 빠짐
+# ------------------------------------------------------------
+PDF_REFERENCE_PATTERN = re.compile(r"(\d+) \d+ R")
+
+
+def _source_digest(doc, source: str, memo: Dict[int, bytes]) -> "hashlib._Hash":
+    digest = hashlib.sha256(PDF_REFERENCE_PATTERN.sub("R", source).encode("utf-8", "surrogateescape"))
+    for ref in PDF_REFERENCE_PATTERN.findall(source):
+        digest.update(_object_digest(doc, int(ref), memo))
+    return digest
+
+
+def _object_digest(doc, xref: int, memo: Dict[int, bytes]) -> bytes:
+    """
+    객체 원문 + (스트림이면) 원본 스트림 + 참조하는 객체들의 해시
+    memo: 문서 안에서 공유 (여러 페이지가 같은 글꼴/이미지를 참조해도 한 번만 계산)
+    """
+    digest = memo.get(xref)
+    if digest is not None:
+        return digest
+    memo[xref] = b"cycle"  # 순환 참조는 자리표시 값으로 끊음
+    try:
+        source = doc.xref_object(xref, compressed=True)
+    except Exception:
+        source = "null"  # 손상되었거나 없는 객체
+    digest = _source_digest(doc, source, memo)
+    if doc.xref_is_stream(xref):
+        digest.update(doc.xref_stream_raw(xref) or b"")
+    memo[xref] = digest.digest()
+    return memo[xref]
+
+
+def _page_resources(page) -> str:
+    """페이지의 /Resources 원문 (페이지에 없으면 상위 페이지 트리에서 상속)"""
+    doc = page.parent
+    xref = page.xref
+    while xref:
+        kind, value = doc.xref_get_key(xref, "Resources")
+        if kind != "null":
+            return value if kind != "xref" else f"{value.split()[0]} 0 R"
+        kind, parent = doc.xref_get_key(xref, "Parent")
+        xref = int(parent.split()[0]) if kind == "xref" else 0
+    return ""
+
+
+def page_fingerprint(page, memo: Optional[Dict[int, bytes]] = None) -> str:
+    memo = {} if memo is None else memo
+    digest = hashlib.sha256(page.read_contents())
+    digest.update(f"|{tuple(page.rect)}|{page.rotation}|".encode())
+    digest.update(_source_digest(page.parent, _page_resources(page), memo).digest())
+    return digest.hexdigest()
+
+
+def page_fingerprints(source) -> List[str]:
+    with open_pdf(source) as doc:
+        memo: Dict[int, bytes] = {}
+        return [page_fingerprint(page, memo) for page in doc]
+
+
+def load_revision(file_bytes: bytes, previous: Optional[Dict] = None,
+                  cache: Optional[DocumentCache] = None, workers: int = 1) -> Dict:
+    """
+    같은 제안서의 새 버전을 로드 (previous: 이전 버전의 load_revision 반환값)
+    반환값: load_document 와 같은 dict + "page_hashes" (페이지별 지문)
+    """
+    cache = cache or _document_cache
+    reusable = previous is not None and "page_hashes" in previous and isinstance(previous["pages"], PageStore)
+    if not reusable:
+        entry = load_document(file_bytes, cache=cache, workers=workers)
+        if "page_hashes" not in entry and not any("error" in p for p in entry["pages"]):
+            entry["page_hashes"] = page_fingerprints(file_bytes)
+            cache.put(entry["hash"], entry)
+        return entry
+
+    with stage("pdf.load_revision", bytes=len(file_bytes)) as s:
+        key = compute_file_hash(file_bytes)
+        entry = cache.get(key)
+        if entry is not None and "page_hashes" in entry:
+            s.set(cache="hit", pages=len(entry["pages"]))
+            return entry
+
+        previous_pages = {}
+        for h, page in zip(previous["page_hashes"], previous["pages"]):
+            previous_pages.setdefault(h, page)
+
+        records, hashes, extracted = [], [], 0
+        try:
+            with open_pdf(file_bytes) as doc:
+                memo: Dict[int, bytes] = {}
+                for i, page in enumerate(doc):
+                    h = page_fingerprint(page, memo)
+                    old = previous_pages.get(h)
+                    if old is None:
+                        record = _page_entry(i, page)
+                        extracted += 1
+                    else:
+                        record = dict(old)
+                        record["page_number"] = i + 1
+                    records.append(record)
+                    hashes.append(h)
+        except Exception:
+            return load_document(file_bytes, cache=cache, workers=workers)
+
+        pages = PageStore.from_records(records)
+        entry = {
+            "hash": key,
+            "pages": pages,
+            "text": pages.text,
+            "stats": pages.statistics(),
+            "page_hashes": hashes,
+        }
+        cache.put(key, entry)
+        s.set(cache="miss", pages=len(pages), extracted=extracted, reused=len(pages) - extracted)
+        return entry
+
+
 # ------------------------------------------------------------
 # 🧪 로컬 경로에서 PDF 텍스트 추출
 # ------------------------------------------------------------
 def extract_text_from_local_pdf(path: str) -> str:
     if not os.path.exists(path):
         return "[파일 없음]"
-    with open(path, "rb") as f:
-        return extract_text_from_pdf(f)
+    # 파일 전체를 읽지 않고 메모리 매핑으로 열기
+    return extract_text_from_pdf(path)
 
 
 # ------------------------------------------------------------
@@ -92,7 +633,7 @@ def analyze_pdf_structure(uploaded_file) -> Dict:
     stats = summarize_pdf_statistics(page_data)
     return {
         "통계": stats,
-        "페이지별 정보": page_data
+        "페이지별 정보": page_data.to_records() if isinstance(page_data, PageStore) else page_data
     }
 
 
@@ -0,0 +1,42 @@
+import time
+import math
+
+# ================================================================
+# 🚦 LLM 호출 속도 제한 유틸
+# - 토큰 버킷: 분당 요청 수(RPM) / 분당 토큰 수(TPM) 제한 준수
+# - 토큰 수 추정: 영문·숫자 약 4자당 1토큰, 한글 등 비ASCII 문자는 1자당 1토큰
+# ================================================================
+
+
+def estimate_tokens(text: str) -> int:
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return math.ceil(ascii_chars / 4 + (len(text) - ascii_chars))
+
+
+class TokenBucket:
+    def __init__(self, rate_per_minute: float, capacity: float = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1):
+        # 버킷 용량보다 큰 요청은 용량만큼만 차감 (영원히 대기하지 않도록)
+        import asyncio
+
+        amount = min(amount, self.capacity)
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
@@ -0,0 +1,303 @@
+import os
+import json
+import time
+import uuid
+import queue
+import atexit
+import sqlite3
+import threading
+from typing import List, Dict, Optional
+
+# ================================================================
+# 🗃️ 평가 이력 저장소 (SQLite, WAL)
+# - runs: 평가 1회 (문서 해시/이름, 비교 방식, 상태별 개수, 단계별 시간)
+# - results: 항목별 결과 (검색이 잦은 제안서 이름/시각을 함께 저장, 추가만 함)
+# - feedback: 생성된 피드백 (LLM 캐시 키로 원본 응답 참조)
+# - 기록은 큐에 넣고 즉시 반환 → 백그라운드 스레드가 모아서 트랜잭션 한 번으로 기록
+# - 조회 도우미: 평가 이력 / 항목별 이력·추이 / 항목별 집계
+#   → 기본은 이미 기록된 내용만 조회 (기록 대기열을 기다리지 않음, 앱 화면이 기록에 막히지 않음)
+#   → 방금 넣은 기록까지 봐야 하면 flush=True (CLI, 점검 스크립트)
+# ================================================================
+
+STORE_PATH = "results.sqlite"
+BATCH_SIZE = 200
+FLUSH_INTERVAL = 0.5  # 초: 이 시간 동안 모인 기록을 한 번에 기록
+STATUSES = ("포함됨", "부분 포함", "누락됨")
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS runs ("
+    "run_id TEXT PRIMARY KEY, created REAL NOT NULL, source TEXT, "
+    "rfp_hash TEXT, rfp_name TEXT, proposal_hash TEXT, proposal_name TEXT, mode TEXT, "
+    "item_count INTEGER, included INTEGER, partial INTEGER, missing INTEGER, timings TEXT)",
+    "CREATE TABLE IF NOT EXISTS results ("
+    "run_id TEXT NOT NULL, position INTEGER NOT NULL, created REAL NOT NULL, "
+    "proposal_hash TEXT, proposal_name TEXT, section TEXT, item TEXT, "
+    "keyword_count INTEGER, score REAL, status TEXT, evidence_pages TEXT, "
+    "PRIMARY KEY (run_id, position))",
+    "CREATE TABLE IF NOT EXISTS feedback ("
+    "feedback_id TEXT PRIMARY KEY, run_id TEXT, created REAL NOT NULL, "
+    "model TEXT, cache_key TEXT, elapsed_s REAL, content TEXT)",
+    "CREATE INDEX IF NOT EXISTS idx_runs_created ON runs(created)",
+    "CREATE INDEX IF NOT EXISTS idx_runs_proposal ON runs(proposal_name, created)",
+    "CREATE INDEX IF NOT EXISTS idx_runs_proposal_hash ON runs(proposal_hash)",
+    "CREATE INDEX IF NOT EXISTS idx_results_item ON results(item, created)",
+    "CREATE INDEX IF NOT EXISTS idx_results_section ON results(section, created)",
+    "CREATE INDEX IF NOT EXISTS idx_results_proposal_item ON results(proposal_name, item, created)",
+    "CREATE INDEX IF NOT EXISTS idx_feedback_run ON feedback(run_id)",
+]
+
+_FLUSH = object()
+_STOP = object()
+
+
+def _glob_prefix(text: str) -> str:
+    """GLOB 접두사 패턴 (색인 사용 가능, 특수 문자는 [] 로 감쌈)"""
+    escaped = "".join(f"[{c}]" if c in "*?[" else c for c in text)
+    return escaped + "*"
+
+
+class ResultsStore:
+    def __init__(self, path: str = STORE_PATH, batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._read_conn: Optional[sqlite3.Connection] = None
+        self._read_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            conn.execute(statement)
+        conn.commit()
+        return conn
+
+    # --------------------------------------------------------
+    # ✍️ 기록 (호출 즉시 반환)
+    # --------------------------------------------------------
+    def record_run(self, results: List[Dict], source: str = "app", proposal_name: Optional[str] = None,
+                   proposal_hash: Optional[str] = None, rfp_name: Optional[str] = None,
+                   rfp_hash: Optional[str] = None, mode: Optional[str] = None,
+                   timings: Optional[Dict] = None) -> str:
+        run_id = uuid.uuid4().hex
+        created = time.time()
+        counts = {status: 0 for status in STATUSES}
+        rows = []
+        for position, item in enumerate(results):
+            counts[item["포함여부"]] = counts.get(item["포함여부"], 0) + 1
+            pages = item.get("근거페이지")
+            rows.append((
+                run_id, position, created, proposal_hash, proposal_name, item.get("섹션"), item["항목"],
+                item.get("키워드수"), item.get("매칭률"), item["포함여부"],
+                json.dumps(pages) if pages is not None else None,
+            ))
+        run = (
+            run_id, created, source, rfp_hash, rfp_name, proposal_hash, proposal_name, mode, len(results),
+            counts["포함됨"], counts["부분 포함"], counts["누락됨"],
+            json.dumps(timings, ensure_ascii=False) if timings else None,
+        )
+        self._put(("run", run, rows))
+        return run_id
+
+    def record_feedback(self, run_id: Optional[str], content: str, model: Optional[str] = None,
+                        cache_key: Optional[str] = None, elapsed_s: Optional[float] = None) -> str:
+        feedback_id = uuid.uuid4().hex
+        self._put(("feedback", (feedback_id, run_id, time.time(), model, cache_key, elapsed_s, content)))
+        return feedback_id
+
+    def flush(self):
+        """대기 중인 기록이 모두 저장될 때까지 대기"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_FLUSH)
+            self._queue.join()
+
+    def close(self):
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        with self._read_lock:
+            if self._read_conn is not None:
+                self._read_conn.close()
+                self._read_conn = None
+
+    def _put(self, op):
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._writer, name="results-store-writer", daemon=True)
+                self._thread.start()
+        self._queue.put(op)
+
+    # 🧵 백그라운드 기록 스레드
+    def _writer(self):
+        conn = self._connect()
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not _FLUSH and batch[-1] is not _STOP:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            stop = batch[-1] is _STOP
+            try:
+                self._write(conn, [op for op in batch if op is not _FLUSH and op is not _STOP])
+            except sqlite3.Error as e:
+                from event_log import log_event
+                log_event(f"⚠️ 평가 이력 저장 실패 ({len(batch)}건): {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        conn.close()
+
+    @staticmethod
+    def _write(conn: sqlite3.Connection, ops: List[tuple]):
+        if not ops:
+            return
+        runs, results, feedback = [], [], []
+        for op in ops:
+            if op[0] == "run":
+                runs.append(op[1])
+                results.extend(op[2])
+            else:
+                feedback.append(op[1])
+        with conn:
+            conn.executemany("INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", runs)
+            conn.executemany("INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", results)
+            conn.executemany("INSERT INTO feedback VALUES (?, ?, ?, ?, ?, ?, ?)", feedback)
+
+    # --------------------------------------------------------
+    # 🔎 조회 도우미
+    # --------------------------------------------------------
+    def _query(self, sql: str, params: tuple = (), flush: bool = False) -> List[Dict]:
+        if flush:
+            self.flush()
+        with self._read_lock:
+            if self._read_conn is None:
+                self._read_conn = self._connect()
+                self._read_conn.row_factory = sqlite3.Row
+            return [dict(row) for row in self._read_conn.execute(sql, params).fetchall()]
+
+    @staticmethod
+    def _since(days: Optional[float]) -> float:
+        return time.time() - days * 86400 if days is not None else 0.0
+
+    def history(self, proposal: Optional[str] = None, days: Optional[float] = None, limit: int = 50,
+                flush: bool = False) -> List[Dict]:
+        """최근 평가 목록 (proposal: 제안서 파일명 또는 해시)"""
+        sql = "SELECT * FROM runs WHERE created >= ?"
+        params = [self._since(days)]
+        if proposal:
+            sql += " AND (proposal_name = ? OR proposal_hash = ?)"
+            params += [proposal, proposal]
+        sql += " ORDER BY created DESC LIMIT ?"
+        rows = self._query(sql, tuple(params + [limit]), flush)
+        for row in rows:
+            row["timings"] = json.loads(row["timings"]) if row["timings"] else {}
+        return rows
+
+    def item_history(self, item: str, proposal: Optional[str] = None, days: Optional[float] = None,
+                     flush: bool = False) -> List[Dict]:
+        """
+        항목(또는 섹션) 하나의 평가 이력 — item 은 앞부분만 써도 됨 (예: "3.2")
+        """
+        sql = ("SELECT created, run_id, proposal_name, proposal_hash, section, item, score, status "
+               "FROM results WHERE (item GLOB ? OR section GLOB ?) AND created >= ?")
+        pattern = _glob_prefix(item)
+        params = [pattern, pattern, self._since(days)]
+        if proposal:
+            sql += " AND (proposal_name = ? OR proposal_hash = ?)"
+            params += [proposal, proposal]
+        return self._query(sql + " ORDER BY created", tuple(params), flush)
+
+    def item_trend(self, item: str, proposal: Optional[str] = None, days: Optional[float] = None,
+                   flush: bool = False) -> List[Dict]:
+        """항목별 일자별 평균 매칭률과 상태 개수"""
+        sql = ("SELECT date(created, 'unixepoch', 'localtime') AS day, COUNT(*) AS evaluations, "
+               "ROUND(AVG(score), 3) AS avg_score, "
+               "SUM(status = '포함됨') AS included, SUM(status = '부분 포함') AS partial, "
+               "SUM(status = '누락됨') AS missing "
+               "FROM results WHERE (item GLOB ? OR section GLOB ?) AND created >= ?")
+        pattern = _glob_prefix(item)
+        params = [pattern, pattern, self._since(days)]
+        if proposal:
+            sql += " AND (proposal_name = ? OR proposal_hash = ?)"
+            params += [proposal, proposal]
+        return self._query(sql + " GROUP BY day ORDER BY day", tuple(params), flush)
+
+    def item_aggregates(self, proposal: Optional[str] = None, rfp_hash: Optional[str] = None,
+                        days: Optional[float] = None, limit: int = 100, flush: bool = False) -> List[Dict]:
+        """항목별 집계 (평균 매칭률이 낮은 항목부터)"""
+        sql = ("SELECT r.section, r.item, COUNT(*) AS evaluations, ROUND(AVG(r.score), 3) AS avg_score, "
+               "MIN(r.score) AS min_score, MAX(r.score) AS max_score, "
+               "SUM(r.status = '포함됨') AS included, SUM(r.status = '부분 포함') AS partial, "
+               "SUM(r.status = '누락됨') AS missing "
+               "FROM results r")
+        params = []
+        if rfp_hash:
+            sql += " JOIN runs USING (run_id) WHERE runs.rfp_hash = ? AND r.created >= ?"
+            params += [rfp_hash, self._since(days)]
+        else:
+            sql += " WHERE r.created >= ?"
+            params.append(self._since(days))
+        if proposal:
+            sql += " AND (r.proposal_name = ? OR r.proposal_hash = ?)"
+            params += [proposal, proposal]
+        sql += " GROUP BY r.section, r.item ORDER BY avg_score, evaluations DESC LIMIT ?"
+        return self._query(sql, tuple(params + [limit]), flush)
+
+    def run_results(self, run_id: str, flush: bool = False) -> List[Dict]:
+        return self._query("SELECT * FROM results WHERE run_id = ? ORDER BY position", (run_id,), flush)
+
+    def run_feedback(self, run_id: str, flush: bool = False) -> List[Dict]:
+        return self._query("SELECT * FROM feedback WHERE run_id = ? ORDER BY created", (run_id,), flush)
+
+
+_results_store: Optional[ResultsStore] = None
+_store_lock = threading.Lock()
+
+
+def get_results_store() -> ResultsStore:
+    global _results_store
+    with _store_lock:
+        if _results_store is None:
+            _results_store = ResultsStore()
+            atexit.register(_results_store.close)
+        return _results_store
+
+
+# ------------------------------------------------------------
+# ▶️ 동작 확인 (직접 실행 시)
+# ------------------------------------------------------------
+if __name__ == "__main__":
+    import tempfile
+
+    store = ResultsStore(path=os.path.join(tempfile.mkdtemp(), "results.sqlite"))
+    start = time.perf_counter()
+    for n in range(100):
+        store.record_run(
+            [{"항목": "3.2 데이터 수집 방법", "키워드수": 3, "매칭률": round(n / 100, 2),
+              "포함여부": "포함됨" if n >= 90 else "부분 포함" if n >= 40 else "누락됨"},
+             {"항목": "3.3 유지보수 방안", "키워드수": 2, "매칭률": 0.5, "포함여부": "부분 포함"}],
+            source="demo", proposal_name=f"제안서_{n % 3}.pdf", proposal_hash=f"hash{n % 3}",
+            timings={"전체(s)": 0.1}
+        )
+    enqueue = time.perf_counter() - start
+    store.flush()
+    print(f"⏱ 기록 100건 큐 적재 {enqueue * 1000:.1f}ms, 저장 완료 {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    assert len(store.history(limit=1000)) == 100
+    assert len(store.item_history("3.2", proposal="제안서_1.pdf")) == 33
+    print("📈 추이:", store.item_trend("3.2"))
+    print("📊 집계:", store.item_aggregates())
+    store.close()
+    print("✅ 평가 이력 저장소 확인 완료")
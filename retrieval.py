@@ -0,0 +1,184 @@
+import os
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Optional
+
+from instrumentation import stage
+
+# ================================================================
+# 🔎 제안요청서 문단 검색 인덱스
+# - RFP 내용(SHA-256)당 한 번만 TF-IDF 학습 → 메모리 + 디스크 캐시
+# - 한글 교착어 특성을 고려해 문자 n-gram(char_wb 2~4) 사용
+# - 문단 벡터는 L2 정규화된 희소 행렬 → 내적이 곧 코사인 유사도
+# - 디스크 캐시는 총 MAX_DISK_BYTES 를 넘으면 오래 쓰지 않은 파일부터 삭제
+# - scikit-learn / numpy 는 인덱스를 처음 만들 때 import (앱 시작 시간 단축)
+# ================================================================
+
+INDEX_CACHE_DIR = os.path.join(".cache", "retrieval")
+MIN_PARAGRAPH_LENGTH = 30
+
+
+# ------------------------------------------------------------
+# ✂️ 문단 분리
+# ------------------------------------------------------------
+def split_paragraphs(text: str, min_length: int = MIN_PARAGRAPH_LENGTH) -> List[str]:
+    return [p.strip() for p in text.split("\n\n") if len(p.strip()) > min_length]
+
+
+# ------------------------------------------------------------
+# 📚 문단 인덱스
+# ------------------------------------------------------------
+class ParagraphIndex:
+    def __init__(self, paragraphs: List[str], ngram_range: tuple = (2, 4)):
+        import numpy as np
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        self.paragraphs = paragraphs
+        self.vectorizer = TfidfVectorizer(
+            analyzer="char_wb",
+            ngram_range=ngram_range,
+            sublinear_tf=True,
+            dtype=np.float32
+        )
+        if paragraphs:
+            self.matrix = self.vectorizer.fit_transform(paragraphs).tocsr()
+        else:
+            self.matrix = None
+
+    def __len__(self) -> int:
+        return len(self.paragraphs)
+
+    def query_many(self, queries: List[str], top_k: int = 5) -> List[List[Dict]]:
+        """
+        여러 질의를 한 번에 처리 (재학습 없음)
+        반환: 질의별 [{"index", "score", "paragraph"}] (점수 내림차순)
+        """
+        if self.matrix is None or not queries:
+            return [[] for _ in queries]
+
+        query_vectors = self.vectorizer.transform(queries)
+        scores = (query_vectors @ self.matrix.T).toarray()
+        k = min(top_k, scores.shape[1])
+
+        return [
+            [{"index": i, "score": float(row[i]), "paragraph": self.paragraphs[i]} for i in top_indices(row, k)]
+            for row in scores
+        ]
+
+    def query(self, text: str, top_k: int = 5) -> List[Dict]:
+        return self.query_many([text], top_k=top_k)[0]
+
+
+def top_indices(row, k: int) -> List[int]:
+    """점수 벡터에서 상위 k개 위치 (점수 내림차순, 동점은 앞 위치 우선)"""
+    import numpy as np
+
+    top = np.argpartition(-row, k - 1)[:k]
+    return [int(i) for i in top[np.argsort(-row[top], kind="stable")]]
+
+
+# ------------------------------------------------------------
+# 🗃️ 인덱스 캐시 (RFP 텍스트 해시 기준)
+# ------------------------------------------------------------
+_index_memory: "OrderedDict[str, ParagraphIndex]" = OrderedDict()
+_index_lock = threading.Lock()
+MAX_MEMORY_INDEXES = 8
+MAX_DISK_BYTES = 200 * 1024 * 1024
+
+
+def _load_index(path: str) -> Optional[ParagraphIndex]:
+    try:
+        with open(path, "rb") as f:
+            index = pickle.load(f)
+        os.utime(path)  # 최근 사용 시각 갱신 (디스크 LRU 기준)
+        return index
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+
+
+def _save_index(path: str, index: ParagraphIndex, max_disk_bytes: int = MAX_DISK_BYTES):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+        _evict_disk(os.path.dirname(path), max_disk_bytes)
+    except OSError:
+        pass
+
+
+def _evict_disk(cache_dir: str, max_disk_bytes: int):
+    files = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(".pkl"):
+            path = os.path.join(cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # 다른 프로세스가 먼저 삭제
+            files.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_disk_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+
+
+def get_text_index(documents: List[str], cache_dir: str = INDEX_CACHE_DIR) -> ParagraphIndex:
+    """
+    문단(또는 페이지) 목록에 대한 인덱스를 내용 해시 기준으로 재사용
+    """
+    digest = hashlib.sha256()
+    for doc in documents:
+        digest.update(doc.encode("utf-8"))
+        digest.update(b"\x00")
+    key = digest.hexdigest()
+
+    with _index_lock:
+        index = _index_memory.get(key)
+        if index is not None:
+            _index_memory.move_to_end(key)
+            return index
+
+    with stage("retrieval.get_text_index", documents=len(documents)) as s:
+        path = os.path.join(cache_dir, f"{key}.pkl")
+        index = _load_index(path)
+        s.set(cache="disk" if index is not None else "miss")
+        if index is None:
+            index = ParagraphIndex(documents)
+            _save_index(path, index)
+
+    with _index_lock:
+        _index_memory[key] = index
+        while len(_index_memory) > MAX_MEMORY_INDEXES:
+            _index_memory.popitem(last=False)
+    return index
+
+
+def get_paragraph_index(rfp_text: str, cache_dir: str = INDEX_CACHE_DIR) -> ParagraphIndex:
+    return get_text_index(split_paragraphs(rfp_text), cache_dir=cache_dir)
+
+
+# ------------------------------------------------------------
+# 📘 제안요청서에서 가장 유사한 문단만 추출
+# ------------------------------------------------------------
+def get_best_matching_section(rfp_text: str, title: str, threshold: float = 0.1) -> str:
+    return best_matching_paragraph(get_paragraph_index(rfp_text), title, threshold)
+
+
+def best_matching_paragraph(index: ParagraphIndex, title: str, threshold: float = 0.1) -> str:
+    if not len(index):
+        return "[❗ 유효한 문단이 없습니다.]"
+
+    with stage("retrieval.query", paragraphs=len(index)):
+        top = index.query(title, top_k=1)
+    if not top or top[0]["score"] < threshold:
+        return "[❗ 관련 항목을 찾을 수 없습니다.]"
+
+    return top[0]["paragraph"]
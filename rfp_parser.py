@@ -0,0 +1,103 @@
+import re
+from typing import List, Dict
+
+# 항목 포맷: Ⅱ-4 시스템 기능 요구사항, 3. 주요 기능 설명, 3.1 보안, (1) 개요 등 다양한 형식 대응
+# (번호는 1~2자리로 제한하여 "2024년", "1,000만원" 같은 본문 줄은 제외)
+SECTION_PATTERN = re.compile(r'^(\(?(?:[ⅠⅡⅢⅣⅤⅥⅦⅧⅨⅩ]|\d{1,2})(?:[-.]\d{1,2})*\)?\.?)\s+(.+)')
+ROMAN_NUMERALS = "ⅠⅡⅢⅣⅤⅥⅦⅧⅨⅩ"
+
+
+def extract_sections_from_text(text):
+    sections = {}
+    current_section = None
+
+    lines = text.split('\n')
+    for line in lines:
+        line = line.strip()
+
+        match = SECTION_PATTERN.match(line)
+        if match:
+            section_number = match.group(1).strip()
+            section_title = match.group(2).strip()
+            current_section = f"{section_number} {section_title}"
+            sections[current_section] = []
+        elif current_section:
+            sections[current_section].append(line)
+
+    # 본문 내용을 다시 합치기
+    for key in sections:
+        sections[key] = '\n'.join(sections[key]).strip()
+
+    return sections
+
+
+def _section_level(number: str, parent_level: int, roman_seen: bool) -> int:
+    # (1) 처럼 괄호로 감싼 번호는 바로 위 번호 체계의 하위 항목
+    if number.startswith("("):
+        return parent_level + 1
+    depth = len([part for part in re.split(r'[-.]', number.rstrip(".)")) if part])
+    # Ⅱ 장 아래의 1., 1.1 은 한 단계 아래
+    if roman_seen and number[0] not in ROMAN_NUMERALS:
+        depth += 1
+    return depth
+
+
+def parse_section_tree(text: str) -> List[Dict]:
+    """
+    번호 체계를 따라 계층형 섹션 트리 생성
+    노드: {"number", "title", "level", "start_line", "end_line", "body", "children"}
+    - start_line: 제목 줄 번호(0부터), end_line: 다음 제목 직전 줄 (본문 범위)
+    - body: 하위 섹션을 제외한 해당 섹션의 본문
+    """
+    roots: List[Dict] = []
+    stack: List[Dict] = []
+    numbered_level = 0
+    roman_seen = False
+    current = None
+
+    lines = text.split('\n')
+    for line_no, raw in enumerate(lines):
+        line = raw.strip()
+        match = SECTION_PATTERN.match(line)
+        if not match:
+            if current is not None and line:
+                current["body"].append(line)
+            continue
+
+        if current is not None:
+            current["end_line"] = line_no - 1
+
+        number = match.group(1).strip()
+        level = _section_level(number, numbered_level, roman_seen)
+        if not number.startswith("("):
+            numbered_level = level
+        roman_seen = roman_seen or number[0] in ROMAN_NUMERALS
+
+        current = {
+            "number": number,
+            "title": match.group(2).strip(),
+            "level": level,
+            "start_line": line_no,
+            "end_line": len(lines) - 1,
+            "body": [],
+            "children": []
+        }
+        while stack and stack[-1]["level"] >= level:
+            stack.pop()
+        (stack[-1]["children"] if stack else roots).append(current)
+        stack.append(current)
+
+    def finalize(nodes):
+        for node in nodes:
+            node["body"] = '\n'.join(node["body"])
+            finalize(node["children"])
+
+    finalize(roots)
+    return roots
+
+
+def iter_sections(tree: List[Dict]):
+    """트리를 문서 순서(전위 순회)로 펼치기"""
+    for node in tree:
+        yield node
+        yield from iter_sections(node["children"])